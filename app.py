@@ -1,61 +1,139 @@
+import time
+START_TIME = time.perf_counter()    # t=0 for the startup timeline printed by the tracker
+
 import cv2
 from lib.tracker import Tracker
 from lib.ui import UI
 from lib.network import Network
+from lib.shared_memory_network import SharedMemoryNetwork
+from lib.stream_server import StreamServer
 from lib.calibration import generate_aruco_markers, calibrate
+from lib.drift_monitor import DriftMonitor
+from lib.profiling import profiler, span
+from lib.scheduler import TrackingLoop, BackgroundTasks, RefreshLimiter
+from lib.app_settings import (STREAM_PROFILE, DEPTH_FILTERS, DEPTH_DECIMATION, LATENCY_LOG, TRANSPORT,
+                              STREAM_SERVER_PORT, SKELETON_MODE, POSITION_MODE, TRACKER_BACKEND, IDLE_GATE,
+                              DRIFT_MONITOR, PROFILING, PROFILE_FRAMES, UI_MAX_FPS, UI_IDLE_POLL,
+                              UDP_ENVELOPE, PLAY_AREA_CENTER)
+
+ARUCO_DICTIONARY = cv2.aruco.DICT_6X6_250
+MARKER_TO_UNITY = {0: [0.0, 0.0, 0.0], 1: [5.0, 0.0, 0.0], 2: [0.0, 0.0, 5.0]}  # Unity positions of the calibration markers
 
 # Initialize components
-tracker = Tracker()     # person detection and tracking
+if PROFILING:
+    profiler.enable()               # record stage spans, "t" or SIGUSR1/Ctrl+Break dumps them
+profiler.install_signal_handler()
+drift_monitor = DriftMonitor(ARUCO_DICTIONARY, MARKER_TO_UNITY) if DRIFT_MONITOR else None  # camera bump detection
+if drift_monitor:
+    drift_monitor.start()
+tracker = Tracker(stream_profile=STREAM_PROFILE, depth_filters=DEPTH_FILTERS,
+                  depth_decimation=DEPTH_DECIMATION, startup_origin=START_TIME,
+                  skeleton_mode=SKELETON_MODE, position_mode=POSITION_MODE,
+                  tracker_backend=TRACKER_BACKEND, idle_gate=IDLE_GATE,
+                  drift_monitor=drift_monitor, play_area_center=PLAY_AREA_CENTER)  # person detection and tracking
+tracker.load_model_async()  # YOLO loads and warms up in the background; the camera starts when a mode needs it
 ui = UI()               # UI using openCV
-network = Network()     # send tracking data to Unity
+if TRANSPORT == "shared_memory":                # send tracking data to Unity
+    network = SharedMemoryNetwork(latency_log=LATENCY_LOG)
+else:
+    network = Network(latency_log=LATENCY_LOG, envelope=UDP_ENVELOPE)
+stream_server = None                            # stream tracking data to dashboards
+if STREAM_SERVER_PORT is not None:
+    stream_server = StreamServer(port=STREAM_SERVER_PORT)
+    try:
+        stream_server.start()
+    except OSError as e:
+        print(f"Stream server disabled, cannot listen on port {STREAM_SERVER_PORT}: {e}")
+        stream_server = None
+
+tasks = BackgroundTasks()                       # config actions, off the UI thread
+refresh = RefreshLimiter(UI_MAX_FPS, UI_IDLE_POLL)  # redraw only on change, at a capped rate
+
+def publish(tracking_data, trace):
+    """Send one frame's tracking data (runs on the tracking thread)."""
+    network.send_tracking_data(tracking_data, trace)
+    if stream_server:
+        stream_server.send_tracking_data(tracking_data, trace)
+
+def run_calibration():
+    tracker.stop()  # Stop the RealSense pipeline (it restarts when testing or live mode needs it)
+    calibrate(ARUCO_DICTIONARY, MARKER_TO_UNITY, stream_profile=tracker.stream_profile)
+    tracker.load_calibration()  # Reload the calibration params
+    print("Calibration ended.")
+
+def create_markers():
+    generate_aruco_markers(ARUCO_DICTIONARY, list(MARKER_TO_UNITY), 200, "markers")
+    print("Markers created in 'markers' directory.")
 
-# Main application loop
+tracking = TrackingLoop(tracker, publish)       # tracking at camera rate on its own thread
+tracking.start()
+
+# Main application loop: UI and input only, tracking and config actions run on their own threads
 while True:
+    frame_start = time.perf_counter_ns()
     current_mode = ui.get_mode()
+    if current_mode == "exit":
+        break
+
+    # Tracking runs in testing and live mode, but never while calibration has the camera
+    tracking_mode = current_mode in ("testing", "live")
+    tracking.set_active(tracking_mode and not tasks.running("calibrate"), with_images=current_mode == "testing")
 
     if current_mode == "home":
-        frame = ui.create_home_screen()
-        cv2.imshow(ui.window_name, frame)
+        if refresh.should_draw(("home",)):
+            cv2.imshow(ui.window_name, ui.create_home_screen())
+            tracker.mark_startup("ui_shown")
 
     elif current_mode == "config":
-        frame = ui.create_config_screen()
-        cv2.imshow(ui.window_name, frame)
-        # Handle marker creation request
+        # Handle marker creation and calibration requests in the background
         if ui.create_markers_requested:
-            generate_aruco_markers(cv2.aruco.DICT_6X6_250, [0, 1, 2], 200, "markers")
             ui.create_markers_requested = False
-            print("Markers created in 'markers' directory.")
-        # Handle calibration request
+            tasks.submit("create_markers", create_markers)
         if ui.calibrate_requested:
-            tracker.stop()  # Stop the RealSense pipeline
-            marker_to_unity = {0: [0.0, 0.0, 0.0], 1: [5.0, 0.0, 0.0], 2: [0.0, 0.0, 5.0]}
-            calibrate(cv2.aruco.DICT_6X6_250, marker_to_unity)
-            tracker.load_calibration()  # Reload the calibration params
-            tracker.start_pipeline()    # Restart the pipeline
             ui.calibrate_requested = False
-            print("Calibration ended.")
+            tasks.submit("calibrate", run_calibration)
+        status = "Calibrating, follow the console..." if tasks.running("calibrate") else None
+        if refresh.should_draw(("config", status)):
+            cv2.imshow(ui.window_name, ui.create_config_screen(status))
 
     elif current_mode == "testing":
-        tracking_data, color_image, depth_colormap, total_delay = tracker.process_frame(with_images=True)
-        if color_image is not None:
-            ui.display_tracking_frame(color_image, depth_colormap, tracking_data)
-        network.send_tracking_data(tracking_data)
+        sequence, output = tracking.latest
+        if output is not None and output[1] is not None and refresh.should_draw(("testing", sequence)):
+            tracking_data, color_image, depth_colormap, _ = output
+            model_error = tracker.detector.error
+            ui.display_tracking_frame(color_image, depth_colormap, tracking_data,
+                                      f"AI model failed to load: {model_error}" if model_error else None)
 
     elif current_mode == "live":
-        tracking_data, _, _, total_delay = tracker.process_frame(with_images=False)
-        frame = ui.create_live_screen(tracker.model.device, total_delay)
-        cv2.imshow(ui.window_name, frame)
-        network.send_tracking_data(tracking_data)
-
-    elif current_mode == "exit":
-        break
+        _, output = tracking.latest
+        device = tracker.detector.device if tracker.detector.ready.is_set() else None
+        total_delay = output[3] if output is not None else 0
+        warning = drift_monitor.message if drift_monitor else None
+        model_error = tracker.detector.error
+        if refresh.should_draw(("live", device, f"{total_delay:.1f}", warning, model_error)):
+            cv2.imshow(ui.window_name, ui.create_live_screen(device, total_delay, warning, model_error))
 
-    # Handle keyboard input - "q" for back/exit
-    key = cv2.waitKey(1) & 0xFF
+    # Handle keyboard input - "q" for back/exit, "t" to dump a trace, "p" to run cProfile.
+    # waitKey also delivers mouse clicks; it sleeps until the next redraw is due instead of spinning.
+    with span("waitKey"):
+        key = cv2.waitKey(refresh.delay(tracking_mode)) & 0xFF
     if key == ord('q'):
         ui.set_mode("home" if current_mode != "home" else "exit")
+    elif key == ord('t'):
+        profiler.dump_requested = True
+    elif key == ord('p'):
+        if tracking.active():
+            tracking.cprofile_frames = PROFILE_FRAMES   # Profile the tracking thread
+        else:
+            profiler.start_cprofile(PROFILE_FRAMES)
+    profiler.end_frame(frame_start, "ui.frame")
 
 # Cleanup
+tracking.stop()
 tracker.stop()
 network.close()
+if stream_server:
+    stream_server.close()
+if drift_monitor:
+    drift_monitor.stop()
 cv2.destroyAllWindows()
@@ -0,0 +1,90 @@
+import time
+import numpy as np
+
+class ActivityGate:
+    """
+    Cheap motion detector on the depth stream that decides when YOLO needs to run.
+
+    Keeps a background model (EMA) of a decimated depth image. A frame counts as moving when
+    enough pixels differ from the background by more than threshold; the gate goes idle
+    after idle_after seconds without motion and wakes on the first moving frame. While idle
+    the tracker only polls one frame every poll_interval seconds; the caller waits in between
+    (see Tracker.idle_delay), so the wait never blocks a UI thread.
+    """
+    def __init__(self, decimate=8, threshold=0.15, min_fraction=0.003, background_alpha=0.02,
+                 idle_after=2.0, poll_interval=0.25):
+        """
+        Parameters:
+        - decimate: int, use every n-th depth pixel in both directions
+        - threshold: float, depth change that counts as motion (meters)
+        - min_fraction: float, fraction of valid pixels that must change for a frame to be moving
+        - background_alpha: float, EMA factor the background adapts with per frame, so someone
+          who left the floor, or furniture that was moved, fades out of it
+        - idle_after: float, seconds without motion before going idle
+        - poll_interval: float, seconds between polled frames while idle
+        """
+        self.decimate = decimate
+        self.threshold = threshold
+        self.min_fraction = min_fraction
+        self.background_alpha = background_alpha
+        self.idle_after = idle_after
+        self.poll_interval = poll_interval
+        self.region = None                      # (x_min, y_min, x_max, y_max) depth pixels of the play area, None for all
+        self.reset()
+
+    def reset(self):
+        self.background = None                  # Decimated background depth (meters), NaN where unknown
+        self.idle = False                       # True after idle_after seconds without motion
+        self.last_motion = time.perf_counter()
+        self.next_poll = 0.0
+        self.moving_fraction = 0.0              # Fraction of changed pixels in the last frame
+        self.last_time = 0.0                    # Cost of the last update (ms)
+
+    def update(self, depth_frame):
+        """
+        Compare one depth frame with the background and update the idle state.
+
+        Parameters:
+        - depth_frame: RealSense depth frame (raw or aligned)
+
+        Returns:
+        - moving: bool, True if the frame differs from the background
+        """
+        start = time.perf_counter()
+        depth = np.asanyarray(depth_frame.get_data())
+        if self.region is not None:
+            x_min, y_min, x_max, y_max = self.region
+            depth = depth[y_min:y_max, x_min:x_max]
+        depth = depth[::self.decimate, ::self.decimate].astype(np.float32) * depth_frame.get_units()
+        depth[depth == 0] = np.nan              # 0 = no depth
+
+        if self.background is None or self.background.shape != depth.shape:
+            self.background = depth
+            moving = False
+        else:
+            changed = np.abs(depth - self.background) > self.threshold     # NaN compares False
+            valid = np.count_nonzero(~np.isnan(depth))
+            self.moving_fraction = np.count_nonzero(changed) / valid if valid else 0.0
+            moving = self.moving_fraction > self.min_fraction
+            # Adapt the background, fill in pixels that just got a depth
+            known = ~np.isnan(depth)
+            self.background[known] += self.background_alpha * (depth[known] - self.background[known])
+            unknown = np.isnan(self.background)
+            self.background[unknown] = depth[unknown]
+
+        now = time.perf_counter()
+        if moving:
+            self.last_motion = now
+            self.idle = False
+        elif now - self.last_motion > self.idle_after:
+            self.idle = True
+        self.last_time = (now - start) * 1000
+        return moving
+
+    def poll_delay(self):
+        """Seconds until the next idle poll is due, 0 when it is due."""
+        return max(0.0, self.next_poll - time.perf_counter())
+
+    def start_poll(self):
+        """Mark an idle poll as taken now, the next one is due poll_interval later."""
+        self.next_poll = time.perf_counter() + self.poll_interval
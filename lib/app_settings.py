@@ -0,0 +1,18 @@
+# Global app settings
+STREAM_PROFILE = "1280x720@30"  # Camera stream profile, see STREAM_PROFILES in camera_profiles.py
+DEPTH_FILTERS = "none"          # Depth post-processing chain, see DEPTH_FILTER_PRESETS in depth_filters.py
+DEPTH_DECIMATION = 1            # Run the depth filters at 1/n resolution (1 = full resolution)
+LATENCY_LOG = None              # File to log per-frame latency traces to (e.g. "latency_log.jsonl"), None disables
+TRANSPORT = "udp"               # Output channel to Unity: "udp" (JSON over loopback) or "shared_memory" (see shared_memory_network.py)
+STREAM_SERVER_PORT = None       # TCP port for dashboard subscribers (e.g. 5007, see stream_server.py), None disables
+SKELETON_MODE = False           # Also send all 17 keypoints per person in 3D (packed, see skeleton.py)
+POSITION_MODE = "depth"         # Foot positions: "depth" (sampled depth) or "floor" (ray to the calibrated floor plane)
+TRACKER_BACKEND = "botsort"     # Track ID association: "botsort", "bytetrack" or "floor" (see association.py)
+IDLE_GATE = False               # Skip YOLO while nothing moves on the floor (see activity.py)
+DRIFT_MONITOR = False           # Check every few seconds that the camera has not moved since calibration (see drift_monitor.py)
+PROFILING = False               # Record stage timings for Chrome trace dumps (see profiling.py)
+PROFILE_FRAMES = 300            # Frames to run cProfile for when "p" is pressed
+UI_MAX_FPS = 30                 # Window redraw cap, tracking runs at camera rate on its own thread
+UI_IDLE_POLL = 0.05             # Seconds between input checks on static screens (home, config)
+UDP_ENVELOPE = False            # True sends {"frame", "capture_ts", "tracks"} packets, False the bare track list the Unity receiver expects
+PLAY_AREA_CENTER = (2.5, 0.0, 2.5)  # Unity position the people nearest to are tracked when over max_tracks (middle of the MARKER_TO_UNITY square), None for the image center
@@ -0,0 +1,164 @@
+import numpy as np
+
+TRACKER_BACKENDS = ("botsort", "bytetrack", "floor")     # See make_associator
+MAX_FEASIBLE_COST = 1.0         # Largest FloorAssociator cost of an allowed match
+INFEASIBLE_COST = 2.0           # Cost of a pair outside the gates
+COST_LIMIT = 1.5                # lapjv leaves pairs above this unassigned: between the two, so no tie at the limit
+
+class UltralyticsAssociator:
+    """
+    Per-source ByteTrack or BoT-SORT state from ultralytics, fed with plain predictions.
+
+    Does what model.track(persist=True) does after inference, but each source owns its own
+    tracker, so batched predictions from several cameras never share or swap track IDs.
+    """
+    def __init__(self, tracker_type="botsort", frame_rate=30):
+        """
+        Parameters:
+        - tracker_type: str, "botsort" (the model.track default) or "bytetrack"
+        - frame_rate: int, camera fps, sets how many frames a lost track is kept
+        """
+        from ultralytics.trackers.track import TRACKER_MAP
+        from ultralytics.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.utils.checks import check_yaml
+
+        cfg = IterableSimpleNamespace(**yaml_load(check_yaml(f"{tracker_type}.yaml")))
+        self.tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)
+
+    def update(self, result):
+        """Assign track IDs to one frame's Results; returns Results whose boxes carry IDs (boxes.id)."""
+        import torch
+
+        det = result.boxes.cpu().numpy()
+        if len(det) == 0:
+            return result
+        tracks = self.tracker.update(det, result.orig_img)
+        if len(tracks) == 0:
+            return result
+        result = result[tracks[:, -1].astype(int)]      # Last column indexes the original detections
+        result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+        return result
+
+    def reset(self):
+        self.tracker.reset()
+
+class FloorAssociator:
+    """
+    Cheap built-in associator: IoU plus distance on the floor, solved with one Hungarian assignment.
+
+    Each track keeps its last box and its last floor position (where the ray through the
+    bottom center of the box meets the floor plane). A detection matches a track when their
+    boxes overlap or, for tracks that went missing behind someone, when it stands close
+    enough on the floor to where the track was last seen. Without a floor plane it falls
+    back to IoU only.
+    """
+    def __init__(self, frame_rate=30, locate=None):
+        """
+        Parameters:
+        - frame_rate: int, camera fps, sets how many frames a lost track is kept
+        - locate: callable or None, maps an (N, 4) xyxy array to (N, 3) floor positions (NaN rows
+          where unknown), None for IoU-only matching
+        """
+        self.locate = locate
+        self.frame_rate = frame_rate
+        self.max_age = frame_rate               # Frames a lost track can still be matched (1 s)
+        self.new_track_conf = 0.25              # Detections below this only extend existing tracks
+        self.min_iou = 0.2                      # IoU-only matches need at least this overlap
+        self.base_distance = 0.3                # Floor distance always allowed for a match (in meters)
+        self.max_speed = 2.0                    # Walking speed bound that widens the gate per missed frame (m/s)
+        self.reset()
+
+    def update(self, result):
+        """Assign track IDs to one frame's Results; returns Results whose boxes carry IDs (boxes.id)."""
+        import lap
+        import torch
+
+        self.frame += 1
+        # Forget tracks that missed more than max_age frames, before matching and also on frames without detections
+        alive = self.frame - self.last_seen - 1 <= self.max_age
+        self.ids, self.boxes, self.last_seen, self.points = (
+            self.ids[alive], self.boxes[alive], self.last_seen[alive], self.points[alive])
+
+        det = result.boxes.cpu().numpy()
+        if len(det) == 0:
+            return result
+        xyxy, conf = det.xyxy, det.conf
+        points = self.locate(xyxy) if self.locate is not None else None
+
+        # Cost matrix [tracks, detections]: 1 - IoU, blended with the floor distance inside the gate,
+        # at most MAX_FEASIBLE_COST for allowed pairs
+        cost = 1.0 - _iou(self.boxes, xyxy)
+        feasible = cost <= 1.0 - self.min_iou
+        if points is not None and len(self.ids):
+            gate = self.base_distance + self.max_speed * (self.frame - self.last_seen) / self.frame_rate
+            distance = np.linalg.norm(self.points[:, None, :] - points[None, :, :], axis=2)
+            located = ~np.isnan(distance)
+            near = located & (distance <= gate[:, None])
+            cost = np.where(located, 0.5 * cost + 0.5 * np.minimum(distance / gate[:, None], 1.0), cost)
+            feasible = np.where(located, near, feasible)
+        cost = np.where(feasible, cost, INFEASIBLE_COST)
+
+        assigned = np.full(len(xyxy), -1)       # Track row per detection
+        if cost.size:
+            _, _, track_of_detection = lap.lapjv(cost, extend_cost=True, cost_limit=COST_LIMIT)
+            assigned = track_of_detection
+
+        # Update matched tracks, start new ones from confident unmatched detections
+        ids = np.full(len(xyxy), -1)
+        matched = assigned >= 0
+        rows = assigned[matched]
+        ids[matched] = self.ids[rows]
+        self.boxes[rows] = xyxy[matched]
+        self.last_seen[rows] = self.frame
+        if points is not None:
+            self.points[rows] = np.where(np.isnan(points[matched]), self.points[rows], points[matched])
+        new = ~matched & (conf >= self.new_track_conf)
+        count = int(new.sum())
+        ids[new] = np.arange(self.next_id, self.next_id + count)
+        self.next_id += count
+        self.ids = np.concatenate((self.ids, ids[new]))
+        self.boxes = np.concatenate((self.boxes, xyxy[new]))
+        self.last_seen = np.concatenate((self.last_seen, np.full(count, self.frame)))
+        new_points = points[new] if points is not None else np.full((count, 3), np.nan)
+        self.points = np.concatenate((self.points, new_points))
+
+        # Same layout as the ultralytics trackers: keep tracked detections, boxes gain an ID column
+        keep = np.flatnonzero(ids >= 0)
+        if keep.size == 0:
+            return result
+        result = result[keep]
+        tracks = np.column_stack((xyxy[keep], ids[keep], conf[keep], det.cls[keep]))
+        result.update(boxes=torch.as_tensor(tracks))
+        return result
+
+    def reset(self):
+        self.frame = 0
+        self.next_id = 1
+        self.ids = np.empty(0, dtype=np.int64)          # Track ID per row
+        self.boxes = np.empty((0, 4))                   # Last xyxy box per track
+        self.last_seen = np.empty(0, dtype=np.int64)    # Frame count at the last match
+        self.points = np.empty((0, 3))                  # Last floor position per track, NaN if unknown
+
+def _iou(a, b):
+    """Pairwise IoU of two sets of xyxy boxes, (len(a), len(b))."""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-9)
+
+def make_associator(backend, frame_rate=30, locate=None):
+    """
+    Create the per-source associator for a tracker backend name.
+
+    Parameters:
+    - backend: str, one of TRACKER_BACKENDS
+    - frame_rate: int, camera fps
+    - locate: callable or None, floor position of boxes (only used by "floor")
+    """
+    if backend == "floor":
+        return FloorAssociator(frame_rate, locate)
+    if backend in TRACKER_BACKENDS:
+        return UltralyticsAssociator(backend, frame_rate)
+    raise ValueError(f"Unknown tracker backend {backend!r}, expected one of {', '.join(TRACKER_BACKENDS)}")
@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 import pyrealsense2 as rs
 import os
+from .geometry import deproject_pixels, fit_plane, refine_plane
+from .camera_profiles import DEFAULT_STREAM_PROFILE, resolve_stream_profile, enable_streams
 
 def generate_aruco_markers(dictionary_type, marker_ids, image_size, output_dir):
     """
@@ -27,10 +29,13 @@ def generate_aruco_markers(dictionary_type, marker_ids, image_size, output_dir):
     
     print(f"Generated {len(marker_ids)} ArUco markers in {output_dir}")
 
-def setup_realsense():
+def setup_realsense(stream_profile=DEFAULT_STREAM_PROFILE):
     """
     Initialize and start the RealSense pipeline for color and depth streams.
 
+    Parameters:
+    - stream_profile: str, a key of STREAM_PROFILES (validated against the connected camera)
+
     Returns:
     - pipeline: the RealSense pipeline object
     - align: the alignment object to align depth to color
@@ -40,8 +45,7 @@ def setup_realsense():
     config = rs.config()
     
     # Enable depth and color streams
-    config.enable_stream(rs.stream.depth, 1280, 720, rs.format.z16, 30)
-    config.enable_stream(rs.stream.color, 1280, 720, rs.format.bgr8, 30)
+    enable_streams(config, resolve_stream_profile(stream_profile))
     
     # Start the pipeline
     pipeline.start(config)
@@ -56,20 +60,22 @@ def setup_realsense():
     
     return pipeline, align, intrinsics
 
-def detect_aruco_markers(color_image, dictionary):
+def detect_aruco_markers(color_image, dictionary, detector=None):
     """
     Detect ArUco markers in the provided color image.
 
     Parameters:
     - color_image: numpy array, the BGR image from the RealSense color stream
     - dictionary: the ArUco dictionary object
+    - detector: cv2.aruco.ArucoDetector or None, reuse one for repeated detection (built from dictionary if None)
 
     Returns:
     - marker_corners: list of detected marker corners
     - marker_ids: list of detected marker IDs
     """
-    parameters = cv2.aruco.DetectorParameters()
-    detector = cv2.aruco.ArucoDetector(dictionary, parameters)
+    if detector is None:
+        parameters = cv2.aruco.DetectorParameters()
+        detector = cv2.aruco.ArucoDetector(dictionary, parameters)
     marker_corners, marker_ids, _ = detector.detectMarkers(color_image)
     
     # Handle case where no markers are detected
@@ -90,23 +96,62 @@ def get_marker_3d_positions(marker_corners, depth_frame, intrinsics):
     Returns:
     - positions: list of 3D points (or None if depth is invalid) for each marker's center
     """
-    positions = []
-    for corners in marker_corners:
-        # Calculate the center of the marker
-        center_x = int(np.mean([c[0][0] for c in corners]))
-        center_y = int(np.mean([c[0][1] for c in corners]))
-        
-        # Get depth at the center
-        depth = depth_frame.get_distance(center_x, center_y)
-        
-        if depth > 0:
-            # Convert pixel coordinates and depth to 3D point
-            point_3d = rs.rs2_deproject_pixel_to_point(intrinsics, [center_x, center_y], depth)
-            positions.append(point_3d)
-        else:
-            positions.append(None)  # Invalid depth reading
-    
-    return positions
+    if len(marker_corners) == 0:
+        return []
+
+    # Calculate the center of every marker at once (each entry is a 1x4x2 array of corners)
+    centers = np.asarray(marker_corners, dtype=np.float64).reshape(-1, 4, 2).mean(axis=1).astype(np.int64)
+
+    # Get depth at the centers
+    depth_image = np.asanyarray(depth_frame.get_data())
+    depths = depth_image[centers[:, 1], centers[:, 0]] * depth_frame.get_units()
+
+    # Convert pixel coordinates and depths to 3D points in one batch
+    points_3d = deproject_pixels(intrinsics, centers, depths).tolist()
+    return [point if depth > 0 else None for point, depth in zip(points_3d, depths)]  # None = invalid depth
+
+def depth_points(depth_frame, intrinsics, stride=8):
+    """
+    Deproject every stride-th valid depth pixel to a 3D camera point.
+
+    Returns:
+    - points: (N, 3) array of camera-frame points (meters)
+    """
+    depth_image = np.asanyarray(depth_frame.get_data())[::stride, ::stride] * depth_frame.get_units()
+    rows, cols = np.nonzero(depth_image > 0)
+    pixels = np.stack((cols * stride, rows * stride), axis=1)
+    return deproject_pixels(intrinsics, pixels, depth_image[rows, cols])
+
+def fit_floor_plane(marker_points, depth_frame, intrinsics, stride=8, threshold=0.03, min_inliers=500):
+    """
+    Fit the floor plane in camera coordinates from the markers and the depth frame.
+
+    The markers lie on the floor, so they give the initial plane. Depth points within
+    threshold of it are then used to refine the plane, which averages out the depth noise
+    of the few marker centers while walls, furniture and people are never considered.
+
+    Parameters:
+    - marker_points: list of 3D marker centers in camera coordinates (at least 3)
+    - depth_frame: RealSense depth frame object, aligned to color
+    - intrinsics: color camera intrinsics
+    - stride: int, use every stride-th depth pixel in both directions
+    - threshold: float, largest distance of a floor point from the plane (meters)
+    - min_inliers: int, fewest floor points for the fit to be trusted
+
+    Returns:
+    - plane: (4,) array [nx, ny, nz, d] (n . p + d = 0, see fit_plane), or None if the floor
+      is not visible enough in the depth frame
+    """
+    points = depth_points(depth_frame, intrinsics, stride)
+    plane, inliers = refine_plane(fit_plane(marker_points), points, threshold)
+    if inliers.sum() < min_inliers:
+        print(f"Warning: only {inliers.sum()} depth points on the floor, floor plane not saved.")
+        return None
+    residuals = points[inliers] @ plane[:3] + plane[3]
+    marker_residuals = np.asarray(marker_points) @ plane[:3] + plane[3]
+    print(f"Floor plane fitted to {inliers.sum()} depth points: RMS {1000 * np.sqrt(np.mean(residuals ** 2)):.1f} mm, "
+          f"markers within {1000 * np.max(np.abs(marker_residuals)):.1f} mm, camera {plane[3]:.2f} m above the floor")
+    return plane
 
 def compute_transformation(P_camera, P_unity):
     """
@@ -148,7 +193,7 @@ def compute_transformation(P_camera, P_unity):
     
     return s, R, t
 
-def save_transformation(scale, rotation, translation, filename="calibration_config.py"):
+def save_transformation(scale, rotation, translation, filename="calibration_config.py", floor_plane=None):
     """
     Save the transformation parameters to a Python file for later use.
 
@@ -157,6 +202,7 @@ def save_transformation(scale, rotation, translation, filename="calibration_conf
     - rotation: 3x3 numpy array, rotation matrix
     - translation: 3x1 numpy array, translation vector
     - filename: str, the file to save the parameters (default: 'calibration_config.py')
+    - floor_plane: (4,) numpy array or None, floor plane in camera coordinates (see fit_floor_plane)
     """
     # Determine the directory where the script is located (the 'lib' folder)
     script_dir = os.path.dirname(os.path.abspath(__file__))  # Path to 'lib'
@@ -167,9 +213,12 @@ def save_transformation(scale, rotation, translation, filename="calibration_conf
         f.write(f"SCALE = {scale}\n")
         f.write(f"ROTATION_MATRIX = np.array({rotation.tolist()})\n")
         f.write(f"TRANSLATION_VECTOR = np.array({translation.tolist()})\n")
+        if floor_plane is not None:
+            f.write(f"FLOOR_PLANE = np.array({floor_plane.tolist()})\n")
     print(f"Transformation saved to {transform_file}")
 
-def calibrate(dictionary_type, marker_to_unity, output_file="calibration_config.py"):
+def calibrate(dictionary_type, marker_to_unity, output_file="calibration_config.py",
+              stream_profile=DEFAULT_STREAM_PROFILE):
     """
     Perform calibration using ArUco markers to align camera coordinates with Unity coordinates.
 
@@ -177,9 +226,10 @@ def calibrate(dictionary_type, marker_to_unity, output_file="calibration_config.
     - dictionary_type: int, the ArUco dictionary type (e.g., cv2.aruco.DICT_6X6_250)
     - marker_to_unity: dict, mapping marker IDs to their known Unity 3D positions (e.g., {0: [0,0,0]})
     - output_file: str, file to save the transformation parameters
+    - stream_profile: str, camera stream profile to calibrate with (a key of STREAM_PROFILES)
     """
     # Initialize RealSense pipeline
-    pipeline, align, intrinsics = setup_realsense()
+    pipeline, align, intrinsics = setup_realsense(stream_profile)
     
     try:
         # step 1 - Prompt user to measure the real-world distance between green and red circles
@@ -231,13 +281,16 @@ def calibrate(dictionary_type, marker_to_unity, output_file="calibration_config.
         
         # Compute the transformation
         s, R, t = compute_transformation(P_camera, P_unity)
+
+        # Fit the floor plane the markers lie on (for position_mode "floor" in the tracker)
+        floor_plane = fit_floor_plane(P_camera, depth_frame, intrinsics)
         
         # Part of step 1
         # Adjust the scale factor by dividing by the projection scale
         #adjusted_scale = s / projection_scale
         
         # Save the adjusted transformation parameters
-        save_transformation(s, R, t, output_file)
+        save_transformation(s, R, t, output_file, floor_plane)
     
     finally:
         # Ensure the pipeline is stopped even if an error occurs
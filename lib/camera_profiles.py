@@ -0,0 +1,94 @@
+import pyrealsense2 as rs                       # python wrapper of d435i SDK
+
+# Named camera stream profiles as (width, height, fps) per stream.
+# Depth is aligned to color, so the color resolution is the one tracking works in.
+# Both streams should share an fps so the pipeline delivers matched framesets.
+STREAM_PROFILES = {
+    "1280x720@30": {"depth": (1280, 720, 30), "color": (1280, 720, 30)},  # default, best detection range
+    "848x480@30": {"depth": (848, 480, 30), "color": (848, 480, 30)},
+    "848x480@60": {"depth": (848, 480, 60), "color": (848, 480, 60)},     # lower latency
+    "640x480@60": {"depth": (640, 480, 60), "color": (640, 480, 60)},
+    "640x480@90": {"depth": (640, 480, 90), "color": (640, 480, 90)},     # needs a 90 fps color sensor (not the D435i)
+    "640x480@15": {"depth": (640, 480, 15), "color": (640, 480, 15)},     # low bandwidth for USB 2 ports
+}
+DEFAULT_STREAM_PROFILE = "1280x720@30"
+
+STREAM_FORMATS = {"depth": (rs.stream.depth, rs.format.z16), "color": (rs.stream.color, rs.format.bgr8)}
+
+def supported_modes(device, stream_name):
+    """
+    List the (width, height, fps) modes a device offers for the depth or color stream.
+
+    Parameters:
+    - device: rs.device, the connected camera
+    - stream_name: str, "depth" or "color"
+
+    Returns:
+    - modes: set of (width, height, fps) tuples
+    """
+    stream, fmt = STREAM_FORMATS[stream_name]
+    modes = set()
+    for sensor in device.query_sensors():
+        for profile in sensor.get_stream_profiles():
+            if profile.stream_type() == stream and profile.format() == fmt:
+                video = profile.as_video_stream_profile()
+                modes.add((video.width(), video.height(), profile.fps()))
+    return modes
+
+def find_device(serial=None):
+    """Connected camera with the given serial number (the first camera for None), or None."""
+    devices = rs.context().query_devices()
+    if serial is None:
+        return devices[0] if len(devices) else None
+    for device in devices:
+        if device.get_info(rs.camera_info.serial_number) == serial:
+            return device
+    return None
+
+def resolve_stream_profile(name, serial=None):
+    """
+    Validate a named stream profile against the connected camera.
+
+    Falls back to DEFAULT_STREAM_PROFILE, with a printed list of supported modes, when the
+    device cannot stream the requested profile. Without a connected device (or none with the
+    given serial) the profile is returned unchecked and starting the pipeline reports the problem.
+
+    Parameters:
+    - name: str, a key of STREAM_PROFILES
+    - serial: str or None, serial number of the camera to check, None for the first one
+
+    Returns:
+    - name: str, the profile to use
+    """
+    if name not in STREAM_PROFILES:
+        raise ValueError(f"Unknown stream profile '{name}'. Choose from: {', '.join(STREAM_PROFILES)}")
+
+    device = find_device(serial)
+    if device is None:
+        return name
+
+    for stream_name, mode in STREAM_PROFILES[name].items():
+        modes = supported_modes(device, stream_name)
+        if mode not in modes:
+            listing = ", ".join(f"{w}x{h}@{fps}" for w, h, fps in sorted(modes, reverse=True))
+            print(f"Stream profile '{name}' not supported: {stream_name} {mode[0]}x{mode[1]}@{mode[2]} unavailable.")
+            print(f"Supported {stream_name} modes: {listing}")
+            print(f"Falling back to '{DEFAULT_STREAM_PROFILE}'.")
+            return DEFAULT_STREAM_PROFILE
+    return name
+
+def enable_streams(config, name, from_file=False):
+    """
+    Enable the depth and color streams of a named profile on an rs.config.
+
+    Parameters:
+    - config: rs.config to configure
+    - name: str, a key of STREAM_PROFILES
+    - from_file: bool, when playing back a .bag the recording decides resolution and fps
+    """
+    for stream_name, (width, height, fps) in STREAM_PROFILES[name].items():
+        stream, fmt = STREAM_FORMATS[stream_name]
+        if from_file:
+            config.enable_stream(stream)
+        else:
+            config.enable_stream(stream, width, height, fmt, fps)
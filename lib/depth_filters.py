@@ -0,0 +1,93 @@
+import time
+import pyrealsense2 as rs                       # python wrapper of d435i SDK
+from .profiling import traced
+
+# RealSense post-processing blocks by name, see the SDK's "Post-processing filters" documentation
+FILTER_FACTORIES = {
+    "decimation": rs.decimation_filter,
+    "threshold": rs.threshold_filter,
+    "depth_to_disparity": lambda: rs.disparity_transform(True),
+    "spatial": rs.spatial_filter,
+    "temporal": rs.temporal_filter,
+    "disparity_to_depth": lambda: rs.disparity_transform(False),
+    "hole_filling": rs.hole_filling_filter,
+}
+
+# Named chains of (filter name, {rs.option name: value}) in the order Intel recommends.
+# Spatial and temporal filtering work best in disparity space, so they sit between the transforms.
+DEPTH_FILTER_PRESETS = {
+    "none": [],
+    "fill": [
+        ("hole_filling", {"holes_fill": 1}),                    # 1 = farthest from around
+    ],
+    "spatial": [
+        ("threshold", {"min_distance": 0.5, "max_distance": 5.0}),
+        ("depth_to_disparity", {}),
+        ("spatial", {"filter_magnitude": 2, "filter_smooth_alpha": 0.5, "filter_smooth_delta": 20, "holes_fill": 2}),
+        ("disparity_to_depth", {}),
+        ("hole_filling", {"holes_fill": 1}),
+    ],
+    "full": [
+        ("threshold", {"min_distance": 0.5, "max_distance": 5.0}),
+        ("depth_to_disparity", {}),
+        ("spatial", {"filter_magnitude": 2, "filter_smooth_alpha": 0.5, "filter_smooth_delta": 20, "holes_fill": 2}),
+        ("temporal", {"filter_smooth_alpha": 0.4, "filter_smooth_delta": 20, "holes_fill": 3}),
+        ("disparity_to_depth", {}),
+        ("hole_filling", {"holes_fill": 1}),
+    ],
+}
+
+class DepthFilterChain:
+    """
+    Configurable chain of RealSense depth post-processing filters with per-filter timing.
+
+    The chain runs on the raw depth frame before it is aligned to color. With decimate > 1
+    a decimation filter is put in front, so every later filter works on a frame with
+    decimate^2 fewer pixels and the alignment step scales the result back up to color resolution.
+    """
+    def __init__(self, steps, decimate=1):
+        """
+        Parameters:
+        - steps: list of (filter name, options dict) tuples or a key of DEPTH_FILTER_PRESETS
+        - decimate: int, decimation magnitude applied before the chain (1 disables it)
+        """
+        if isinstance(steps, str):
+            steps = DEPTH_FILTER_PRESETS[steps]
+        if decimate > 1:
+            steps = [("decimation", {"filter_magnitude": decimate})] + list(steps)
+
+        self.filters = []                       # [(name, processing block)]
+        for name, options in steps:
+            block = FILTER_FACTORIES[name]()
+            for option, value in options.items():
+                block.set_option(getattr(rs.option, option), value)
+            self.filters.append((name, block))
+
+        self.timings = {name: 0.0 for name, _ in self.filters}  # EMA cost of each filter (ms)
+        self.total_time = 0.0                                   # EMA cost of the whole chain (ms)
+        self.last_time = 0.0                                    # cost of the whole chain on the last frame (ms)
+        self.timing_alpha = 0.1                                 # EMA smoothing factor for timings
+
+    @traced("depth_filters")
+    def process(self, frames):
+        """Filter the depth frame of a frameset and return the resulting frameset."""
+        if not self.filters:
+            return frames
+
+        chain_start = time.perf_counter()
+        for name, block in self.filters:
+            start = time.perf_counter()
+            frames = block.process(frames)
+            self.timings[name] = self._smooth(self.timings[name], (time.perf_counter() - start) * 1000)
+        self.last_time = (time.perf_counter() - chain_start) * 1000
+        self.total_time = self._smooth(self.total_time, self.last_time)
+        return frames.as_frameset()
+
+    def _smooth(self, previous, sample):
+        """Update an EMA timing, seeding it with the first sample."""
+        return sample if previous == 0.0 else self.timing_alpha * sample + (1 - self.timing_alpha) * previous
+
+    def describe(self):
+        """Return the filter names and timings as a single printable line."""
+        parts = [f"{name} {self.timings[name]:.2f}ms" for name, _ in self.filters]
+        return f"depth filters {self.total_time:.2f}ms: " + (", ".join(parts) if parts else "none")
@@ -0,0 +1,73 @@
+import threading
+import numpy as np
+from .profiling import traced
+
+class Detector:
+    """
+    YOLO pose model that can be shared by several Trackers.
+
+    predict runs one forward pass over a list of frames, so frames from several cameras,
+    or several consecutive recorded frames, cost a single batched inference. Turning
+    detections into track IDs happens afterwards, per source (see association.py).
+    """
+    def __init__(self, weights='yolo11n-pose.pt', force_cpu=False):
+        self.weights = weights                  # YOLO pose weights, downloaded on first use
+        self.force_cpu = force_cpu
+        self.conf = 0.1                         # Same low threshold as model.track, the trackers use weak detections too
+        self.device = None                      # 'cuda' or 'cpu', decided when the model loads
+        self.model = None
+        self.ready = threading.Event()          # Set once the model is loaded and warmed up
+        self.error = None                       # Message of the last failed load, None if none failed
+        self._load_lock = threading.Lock()
+
+    def load(self, warmup_shape=(720, 1280), on_event=None):
+        """
+        Import torch and ultralytics, load the model and warm it up with a dummy frame.
+
+        Parameters:
+        - warmup_shape: (height, width) of the dummy frame, use the camera's frame size
+        - on_event: callable or None, called with "model_loaded" and "model_warm"
+
+        Raises whatever the import, download or warm-up raised, after storing it in error.
+        """
+        with self._load_lock:
+            if self.ready.is_set():
+                return                          # Already loaded by another Tracker sharing this Detector
+            self.error = None
+            try:
+                self._load(warmup_shape, on_event)
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                raise
+
+    def _load(self, warmup_shape, on_event):
+        import torch                            # For CUDA detection
+        from ultralytics import YOLO            # AI for object detect, track, and pose
+
+        if not self.force_cpu and torch.cuda.is_available():   # Check for CUDA availability
+            self.device = 'cuda'
+        else:
+            self.device = 'cpu'                                 # Fallback to CPU
+        model = YOLO(self.weights).to(self.device)
+        if on_event:
+            on_event("model_loaded")
+
+        # The first inference pays one-time setup (CUDA context, kernel selection), pay it now
+        model.predict(np.zeros((*warmup_shape, 3), dtype=np.uint8), conf=self.conf, verbose=False)
+        self.model = model
+        if on_event:
+            on_event("model_warm")
+        self.ready.set()
+
+    @traced("detector.predict")
+    def predict(self, images):
+        """
+        Run one batched forward pass.
+
+        Parameters:
+        - images: list of BGR numpy images, all from the same kind of camera stream
+
+        Returns:
+        - results: list of ultralytics Results, one per image
+        """
+        return self.model.predict(images, conf=self.conf, verbose=False)
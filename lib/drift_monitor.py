@@ -0,0 +1,153 @@
+import threading
+import time
+import cv2
+import numpy as np
+from .calibration import detect_aruco_markers, get_marker_3d_positions, depth_points
+from .geometry import camera_to_unity, refine_plane
+
+class DepthSnapshot:
+    """Copy of a depth frame's data that outlives the frame (same get_data/get_units interface)."""
+    def __init__(self, depth_frame):
+        self.data = np.asanyarray(depth_frame.get_data()).copy()
+        self.units = depth_frame.get_units()
+
+    def get_data(self):
+        return self.data
+
+    def get_units(self):
+        return self.units
+
+class DriftMonitor:
+    """
+    Background check that the camera has not moved since calibration.
+
+    Every interval seconds the Tracker hands over a copy of one frame. A worker thread then
+    re-observes the calibration markers, when they are still on the floor, and the floor
+    plane, and compares them with the stored calibration:
+    - marker_error: largest distance between a marker's calibrated Unity position and where
+      the current calibration now puts it (meters)
+    - floor_tilt, floor_shift: angle (degrees) and camera height change (meters) between the
+      stored floor plane and the floor seen now
+    alert is set, and a message printed, when any of them exceeds its tolerance.
+    """
+    def __init__(self, dictionary_type, marker_to_unity, interval=5.0,
+                 marker_tolerance=0.05, tilt_tolerance=1.0, shift_tolerance=0.03):
+        """
+        Parameters:
+        - dictionary_type: int, the ArUco dictionary used for calibration (e.g., cv2.aruco.DICT_6X6_250)
+        - marker_to_unity: dict, the marker IDs and Unity positions used for calibration
+        - interval: float, seconds between checks
+        - marker_tolerance, tilt_tolerance, shift_tolerance: alert thresholds (meters, degrees, meters)
+        """
+        self.dictionary = cv2.aruco.getPredefinedDictionary(dictionary_type)
+        self.detector = cv2.aruco.ArucoDetector(self.dictionary, cv2.aruco.DetectorParameters())  # Reused for every check
+        self.marker_to_unity = marker_to_unity
+        self.interval = interval
+        self.marker_tolerance = marker_tolerance
+        self.tilt_tolerance = tilt_tolerance
+        self.shift_tolerance = shift_tolerance
+
+        self.marker_error = None                # Results of the last check, None when not measurable
+        self.floor_tilt = None
+        self.floor_shift = None
+        self.alert = False                      # True while the last check found drift
+        self.message = None                     # Human-readable drift description while alert is set
+        self.last_check = None                  # time.time() of the last check
+        self.check_time = 0.0                   # Cost of the last check on the worker thread (ms)
+
+        self.next_sample = 0.0
+        self._sample = None                     # Frame copy waiting for the worker
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._running = False
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def due(self):
+        """True when the monitor wants a new frame (cheap, call every frame)."""
+        return self._running and self._sample is None and time.perf_counter() >= self.next_sample
+
+    def submit(self, color_image, depth_frame, intrinsics, calibration):
+        """
+        Hand over a copy of one aligned frame for the next check.
+
+        Parameters:
+        - color_image: BGR numpy image
+        - depth_frame: depth frame aligned to color
+        - intrinsics: color camera intrinsics
+        - calibration: (scale, rotation, translation, floor_plane) currently in use
+        """
+        self._sample = (color_image.copy(), DepthSnapshot(depth_frame), intrinsics, calibration)
+        self.next_sample = time.perf_counter() + self.interval
+        self._wake.set()
+
+    def _run(self):
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+            if self._sample is not None:
+                self.check(*self._sample)
+                self._sample = None
+
+    def check(self, color_image, depth_frame, intrinsics, calibration):
+        """Compare one frame with the calibration and update the drift metrics and alert."""
+        start = time.perf_counter()
+        scale, rotation, translation, floor_plane = calibration
+
+        # Markers still on the floor: where does the current calibration put them?
+        self.marker_error = None
+        marker_corners, marker_ids = detect_aruco_markers(color_image, self.dictionary, self.detector)
+        if len(marker_ids):
+            positions = get_marker_3d_positions(marker_corners, depth_frame, intrinsics)
+            errors = [np.linalg.norm(camera_to_unity(np.array([position]), scale, rotation, translation)[0] -
+                                     self.marker_to_unity[marker_id[0]]) / scale
+                      for marker_id, position in zip(marker_ids, positions)
+                      if marker_id[0] in self.marker_to_unity and position is not None]
+            if errors:
+                self.marker_error = float(max(errors))
+
+        # Floor: refit near the stored plane, first loosely to follow a moved camera, then tightly
+        self.floor_tilt = self.floor_shift = None
+        floor_missing = False
+        if floor_plane is not None:
+            points = depth_points(depth_frame, intrinsics)
+            plane, inliers = refine_plane(floor_plane, points, threshold=0.15)
+            plane, inliers = refine_plane(plane, points, threshold=0.03)
+            if inliers.sum() >= 500:
+                self.floor_tilt = float(np.degrees(np.arccos(np.clip(abs(plane[:3] @ floor_plane[:3]), 0, 1))))
+                self.floor_shift = float(abs(plane[3] - floor_plane[3]))
+            else:
+                floor_missing = True
+
+        problems = []
+        if self.marker_error is not None and self.marker_error > self.marker_tolerance:
+            problems.append(f"markers off by {100 * self.marker_error:.1f} cm")
+        if self.floor_tilt is not None and self.floor_tilt > self.tilt_tolerance:
+            problems.append(f"floor tilted by {self.floor_tilt:.1f} deg")
+        if self.floor_shift is not None and self.floor_shift > self.shift_tolerance:
+            problems.append(f"camera height changed by {100 * self.floor_shift:.1f} cm")
+        if floor_missing:
+            problems.append("floor not found where it was calibrated")
+
+        message = "Calibration drift: " + ", ".join(problems) + ". Recalibrate." if problems else None
+        if message and not self.alert:
+            print(message)
+        elif self.alert and not message:
+            print("Calibration drift cleared.")
+        self.alert = message is not None
+        self.message = message
+        self.last_check = time.time()
+        self.check_time = (time.perf_counter() - start) * 1000
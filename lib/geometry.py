@@ -0,0 +1,206 @@
+import numpy as np
+import pyrealsense2 as rs                       # python wrapper of d435i SDK
+
+def deproject_pixels(intrinsics, pixels, depths):
+    """
+    Deproject N pixels with depths to 3D camera points in one call.
+
+    Batched equivalent of rs.rs2_deproject_pixel_to_point, including the distortion
+    models of the SDK's rsutil.h (none, brown conrady, inverse brown conrady,
+    kannala brandt4 and f-theta).
+
+    Parameters:
+    - intrinsics: rs.intrinsics of the stream the pixels belong to
+    - pixels: (N, 2) array of pixel (x, y) coordinates
+    - depths: (N,) array of depths in meters
+
+    Returns:
+    - points: (N, 3) array of 3D points in the camera frame (meters)
+    """
+    pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+    depths = np.asarray(depths, dtype=np.float64).reshape(-1)
+    x = (pixels[:, 0] - intrinsics.ppx) / intrinsics.fx
+    y = (pixels[:, 1] - intrinsics.ppy) / intrinsics.fy
+    coeffs = intrinsics.coeffs
+    model = intrinsics.model
+
+    if model == rs.distortion.modified_brown_conrady:
+        raise ValueError("Cannot deproject from a forward-distorted image (modified brown conrady)")
+    if model in (rs.distortion.inverse_brown_conrady, rs.distortion.brown_conrady):
+        x, y = _undistort_brown_conrady(x, y, coeffs, inverse=model == rs.distortion.inverse_brown_conrady)
+    elif model == rs.distortion.kannala_brandt4:
+        x, y = _undistort_kannala_brandt4(x, y, coeffs)
+    elif model == rs.distortion.ftheta:
+        rd = np.maximum(np.hypot(x, y), np.finfo(np.float32).eps)
+        r = np.tan(coeffs[0] * rd) / np.arctan(2 * np.tan(coeffs[0] / 2.0))
+        x, y = x * r / rd, y * r / rd
+
+    return np.stack((depths * x, depths * y, depths), axis=1)
+
+def _undistort_brown_conrady(x, y, coeffs, inverse):
+    """Iteratively undo (inverse) brown conrady distortion, 10 iterations like the SDK."""
+    if not any(coeffs):
+        return x, y  # D400 color streams report all-zero coefficients
+    k1, k2, p1, p2, k3 = coeffs
+    xo, yo = x, y
+    for _ in range(10):
+        r2 = x * x + y * y
+        icdist = 1 / (1 + ((k3 * r2 + k2) * r2 + k1) * r2)
+        xq, yq = (x / icdist, y / icdist) if inverse else (x, y)
+        delta_x = 2 * p1 * xq * yq + p2 * (r2 + 2 * xq * xq)
+        delta_y = 2 * p2 * xq * yq + p1 * (r2 + 2 * yq * yq)
+        x = (xo - delta_x) * icdist
+        y = (yo - delta_y) * icdist
+    return x, y
+
+def _undistort_kannala_brandt4(x, y, coeffs):
+    """Undo kannala brandt4 (fisheye) distortion with 4 Newton steps like the SDK."""
+    eps = np.finfo(np.float32).eps
+    rd = np.maximum(np.hypot(x, y), eps)
+    theta = rd.copy()
+    for _ in range(4):
+        theta2 = theta * theta
+        f = theta * (1 + theta2 * (coeffs[0] + theta2 * (coeffs[1] + theta2 * (coeffs[2] + theta2 * coeffs[3])))) - rd
+        df = 1 + theta2 * (3 * coeffs[0] + theta2 * (5 * coeffs[1] + theta2 * (7 * coeffs[2] + 9 * theta2 * coeffs[3])))
+        theta = np.where(np.abs(f) < eps, theta, theta - f / df)
+    r = np.tan(theta)
+    return x * r / rd, y * r / rd
+
+def sdk_deprojection_error(intrinsics, samples=16):
+    """
+    Compare deproject_pixels against the SDK on a grid of pixels.
+
+    Returns:
+    - error: float, largest distance between the two results (meters) at 1m depth
+    """
+    xs = np.linspace(0, intrinsics.width - 1, int(np.sqrt(samples)))
+    ys = np.linspace(0, intrinsics.height - 1, int(np.sqrt(samples)))
+    pixels = np.array([(x, y) for y in ys for x in xs])
+    ours = deproject_pixels(intrinsics, pixels, np.ones(len(pixels)))
+    sdk = np.array([rs.rs2_deproject_pixel_to_point(intrinsics, [x, y], 1.0) for x, y in pixels])
+    return float(np.max(np.linalg.norm(ours - sdk, axis=1)))
+
+def camera_to_unity(points, scale, rotation, translation):
+    """
+    Apply the calibrated camera-to-Unity transform to a batch of points.
+
+    Parameters:
+    - points: (N, 3) array of camera-frame points
+    - scale, rotation, translation: the calibration (see compute_transformation)
+
+    Returns:
+    - points: (N, 3) array of Unity-frame points
+    """
+    return scale * (np.asarray(points) @ np.asarray(rotation).T) + translation
+
+def unity_to_camera(points, scale, rotation, translation):
+    """
+    Invert camera_to_unity: map a batch of Unity-frame points back into the camera frame.
+
+    Parameters:
+    - points: (N, 3) array of Unity-frame points
+    - scale, rotation, translation: the calibration (see compute_transformation)
+
+    Returns:
+    - points: (N, 3) array of camera-frame points
+    """
+    return ((np.asarray(points) - np.asarray(translation).reshape(-1)) @ np.asarray(rotation)) / scale
+
+def roi_median_depths(depth_image, pixels, roi_size, min_depth, max_depth, depth_scale=1.0):
+    """
+    Median of the valid depths in a square ROI around each of N pixels, in one pass.
+
+    Only the ROI pixels are converted to meters, not the whole frame. ROI pixels outside
+    the image or outside (min_depth, max_depth) are ignored.
+
+    Parameters:
+    - depth_image: (H, W) raw depth image (z16 units) or depth in meters with depth_scale=1
+    - pixels: (N, 2) array of pixel (x, y) coordinates, truncated to integers
+    - roi_size: int, half-size of the ROI (the ROI is 2 * roi_size + 1 pixels wide)
+    - min_depth, max_depth: valid depth range (meters, exclusive)
+    - depth_scale: float, meters per depth unit
+
+    Returns:
+    - depths: (N,) array of median depths in meters, NaN where the ROI has no valid depth
+    """
+    pixels = np.asarray(pixels).reshape(-1, 2).astype(np.int64)
+    height, width = depth_image.shape
+    offsets = np.arange(-roi_size, roi_size + 1)
+    cols = pixels[:, 0, None] + offsets                         # (N, K)
+    rows = pixels[:, 1, None] + offsets                         # (N, K)
+    inside = ((rows >= 0) & (rows < height))[:, :, None] & ((cols >= 0) & (cols < width))[:, None, :]
+    patches = depth_image[np.clip(rows, 0, height - 1)[:, :, None], np.clip(cols, 0, width - 1)[:, None, :]]
+    patches = patches.astype(np.float32) * depth_scale          # (N, K, K) in meters
+
+    valid = inside & (patches > min_depth) & (patches < max_depth)
+    patches = np.where(valid, patches, np.nan).reshape(len(pixels), -1)
+    depths = np.full(len(pixels), np.nan)
+    has_depth = valid.reshape(len(pixels), -1).any(axis=1)
+    if has_depth.any():
+        depths[has_depth] = np.nanmedian(patches[has_depth], axis=1)
+    return depths
+
+def fit_plane(points):
+    """
+    Least-squares plane through 3 or more points.
+
+    Returns:
+    - plane: (4,) array [nx, ny, nz, d] with unit normal n and n . p + d = 0 on the plane,
+      oriented so the camera origin is on the positive side (d >= 0)
+    """
+    points = np.asarray(points, dtype=np.float64)
+    centroid = points.mean(axis=0)
+    normal = np.linalg.svd(points - centroid, full_matrices=False)[2][-1]    # direction of least variance
+    offset = -normal @ centroid
+    if offset < 0:
+        normal, offset = -normal, -offset
+    return np.append(normal, offset)
+
+def refine_plane(plane, points, threshold, iterations=5):
+    """
+    Iteratively refit a plane to the points within threshold of it.
+
+    Starting from a good initial plane, points far from it (walls, furniture, people) never
+    take part in the fit.
+
+    Parameters:
+    - plane: (4,) initial plane from fit_plane
+    - points: (N, 3) candidate points
+    - threshold: float, largest point-to-plane distance of an inlier (meters)
+
+    Returns:
+    - plane: (4,) refined plane
+    - inliers: (N,) boolean mask of the points used in the last fit
+    """
+    points = np.asarray(points, dtype=np.float64)
+    inliers = np.abs(points @ plane[:3] + plane[3]) < threshold
+    for _ in range(iterations):
+        if inliers.sum() < 3:
+            break
+        plane = fit_plane(points[inliers])
+        refined = np.abs(points @ plane[:3] + plane[3]) < threshold
+        if np.array_equal(refined, inliers):
+            break
+        inliers = refined
+    return plane, inliers
+
+def intersect_plane(intrinsics, pixels, plane, heights=0.0):
+    """
+    Intersect the camera rays through N pixels with a plane, raised by a height per pixel.
+
+    Parameters:
+    - intrinsics: rs.intrinsics of the stream the pixels belong to
+    - pixels: (N, 2) array of pixel (x, y) coordinates
+    - plane: (4,) plane from fit_plane, in the same camera frame
+    - heights: float or (N,) array, distance above the plane (towards the camera) to intersect at
+
+    Returns:
+    - points: (N, 3) array of 3D camera-frame points, NaN where the ray misses the plane
+      (parallel to it or pointing away from it)
+    """
+    rays = deproject_pixels(intrinsics, pixels, np.ones(len(pixels)))   # point at z = 1 on each ray
+    along = rays @ plane[:3]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance = (heights - plane[3]) / along                         # n . (distance * ray) + d = height
+        hits = np.isfinite(distance) & (distance > 0)
+        return np.where(hits[:, None], rays * distance[:, None], np.nan)
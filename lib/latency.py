@@ -0,0 +1,66 @@
+import json
+import time
+
+class FrameTrace:
+    """
+    Timing record of one camera frame as it moves through the pipeline.
+
+    Holds the frame's hardware timestamp and frame number plus monotonic stage stamps
+    (time.perf_counter_ns) taken from the moment the frames arrived on the host.
+    """
+    __slots__ = ("frame_number", "capture_timestamp", "host_clock", "arrival_time", "stages")
+
+    def __init__(self, frame_number, capture_timestamp, host_clock):
+        """
+        Parameters:
+        - frame_number: int, the camera's frame counter
+        - capture_timestamp: float, sensor timestamp of the frame (ms)
+        - host_clock: bool, True if the timestamp is in a host-synced domain (global or system time)
+        """
+        self.frame_number = frame_number
+        self.capture_timestamp = capture_timestamp
+        self.host_clock = host_clock
+        self.arrival_time = time.time() * 1000                      # host wall clock on arrival (ms)
+        self.stages = [("arrival", time.perf_counter_ns())]         # [(stage name, monotonic ns)]
+
+    def stamp(self, stage):
+        """Record that a pipeline stage finished now."""
+        self.stages.append((stage, time.perf_counter_ns()))
+
+    def copy(self):
+        """Independent trace with the same frame and the stages so far, for a second consumer of the frame."""
+        trace = FrameTrace.__new__(FrameTrace)
+        trace.frame_number = self.frame_number
+        trace.capture_timestamp = self.capture_timestamp
+        trace.host_clock = self.host_clock
+        trace.arrival_time = self.arrival_time
+        trace.stages = list(self.stages)
+        return trace
+
+    def capture_latency(self):
+        """Milliseconds from sensor capture until now, or None if the timestamp is not on the host clock."""
+        if not self.host_clock:
+            return None
+        since_arrival = (time.perf_counter_ns() - self.stages[0][1]) / 1e6
+        return self.arrival_time - self.capture_timestamp + since_arrival
+
+    def to_record(self):
+        """Return the trace as a JSON-ready dict with stage times in ms since arrival."""
+        arrival_ns = self.stages[0][1]
+        return {
+            'frame': self.frame_number,
+            'capture_ts': self.capture_timestamp,
+            'capture_to_arrival': self.arrival_time - self.capture_timestamp if self.host_clock else None,
+            'stages': {name: (stamp - arrival_ns) / 1e6 for name, stamp in self.stages[1:]},
+        }
+
+class LatencyLog:
+    """Append finished frame traces to a JSON Lines file for tools/latency_report.py."""
+    def __init__(self, filename):
+        self.file = open(filename, "a", buffering=1 << 16)
+
+    def write(self, trace):
+        self.file.write(json.dumps(trace.to_record()) + "\n")
+
+    def close(self):
+        self.file.close()
@@ -1,21 +1,39 @@
 import socket
 import json
+from .latency import LatencyLog
+from .profiling import traced
 
 class Network:
-    def __init__(self, udp_ip="127.0.0.1", udp_port=5005):
+    def __init__(self, udp_ip="127.0.0.1", udp_port=5005, latency_log=None, envelope=False):
         self.udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.udp_ip = udp_ip            # Loopback to Unity's IP (change if needed)
         self.udp_port = udp_port        # Unity's receiving port
+        self.envelope = envelope        # {"frame", "capture_ts", "tracks"} per packet, False sends the bare track list (Unity receiver)
+        self.latency_log = LatencyLog(latency_log) if latency_log else None     # JSON Lines file of frame traces
 
-    def send_tracking_data(self, tracking_data):
-        # Send data to Unity over UDP
+    @traced("network.send")
+    def send_tracking_data(self, tracking_data, trace=None):
+        # Send data to Unity over UDP, one packet per frame (also without tracks)
         # No filtering; Unity will ignore the 'bbox' field in tracking_data
-        udp_message = json.dumps(tracking_data)
+        # With envelope, 'frame' (camera frame number, doubles as sequence number) and 'capture_ts' (sensor
+        # timestamp in ms) let the receiver detect dropped frames and measure latency, -1 and null without a trace
+        if self.envelope:
+            udp_message = json.dumps({'frame': trace.frame_number if trace is not None else -1,
+                                      'capture_ts': trace.capture_timestamp if trace is not None else None,
+                                      'tracks': tracking_data})
+        else:
+            udp_message = json.dumps(tracking_data)
         try:
             self.udp_sock.sendto(udp_message.encode("utf-8"), (self.udp_ip, self.udp_port))
             print(f"Sent UDP data: {udp_message}")
         except Exception as e:
             print(f"UDP send error: {e}")
+        if trace is not None:
+            trace.stamp("send")
+            if self.latency_log:
+                self.latency_log.write(trace)
 
     def close(self):
-        self.udp_sock.close()
\ No newline at end of file
+        self.udp_sock.close()
+        if self.latency_log:
+            self.latency_log.close()
\ No newline at end of file
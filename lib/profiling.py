@@ -0,0 +1,167 @@
+"""
+Lightweight tracing for finding which stage of the main loop stutters.
+
+Code marks stages with the traced decorator or a span context manager. While the profiler
+is enabled, every finished span goes into a fixed-size ring (the oldest spans are dropped),
+which dump writes as Chrome trace-event JSON (open it in chrome://tracing or
+https://ui.perfetto.dev). While disabled, a span is one attribute check.
+
+A dump can be requested from outside with SIGUSR1 (Linux/macOS) or Ctrl+Break (SIGBREAK,
+Windows); it is written at the end of the current loop iteration. start_cprofile runs
+cProfile on the calling thread for a bounded number of frames and prints the most expensive
+functions.
+"""
+import cProfile
+import functools
+import json
+import os
+import pstats
+import signal
+import threading
+import time
+from collections import deque
+
+class _NullSpan:
+    """Shared do-nothing context manager returned while the profiler is disabled."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start)
+        return False
+
+class Profiler:
+    def __init__(self, capacity=200000):
+        self.enabled = False
+        self.spans = deque(maxlen=capacity)     # (name, thread id, start ns, duration ns), oldest dropped first
+        self.dump_requested = False             # Set by the signal handler, handled in end_frame
+        self._cprofile = None
+        self._cprofile_frames = 0               # Frames left to profile with cProfile
+        self._cprofile_thread = None            # Thread cProfile runs on, only its frames count down
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name):
+        """Context manager timing the enclosed block as one span."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start):
+        """Store a span that started at start (time.perf_counter_ns) and ends now."""
+        self.spans.append((name, threading.get_ident(), start, time.perf_counter_ns() - start))
+
+    def end_frame(self, start, name="frame"):
+        """
+        Call once per loop iteration (UI loop, tracking thread): records the span, then handles
+        pending dump requests and the cProfile frame budget.
+        """
+        if self.enabled:
+            self.record(name, start)
+        if self.dump_requested:
+            self.dump_requested = False
+            self.dump()
+        if self._cprofile is not None and threading.get_ident() == self._cprofile_thread:
+            self._cprofile_frames -= 1
+            if self._cprofile_frames <= 0:
+                self._finish_cprofile()
+
+    def dump(self, filename=None):
+        """
+        Write the spans in the ring as Chrome trace-event JSON.
+
+        Returns:
+        - filename: str, the file written, or None if there was nothing to write
+        """
+        if not self.spans:
+            print("Profiler: no spans recorded" + ("" if self.enabled else " (set PROFILING = True in app_settings.py)"))
+            return None
+        filename = filename or time.strftime("trace_%Y%m%d_%H%M%S.json")
+        pid = os.getpid()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        spans = list(self.spans)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_names.get(tid, str(tid))}}
+                  for tid in {tid for _, tid, _, _ in spans}]
+        events += [{"name": name, "ph": "X", "pid": pid, "tid": tid, "ts": start / 1000, "dur": duration / 1000}
+                   for name, tid, start, duration in spans]
+        with open(filename, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"Profiler: wrote {len(spans)} spans to {filename}")
+        return filename
+
+    def start_cprofile(self, frames):
+        """Run cProfile on the calling thread for its next frames loop iterations."""
+        if self._cprofile is not None:
+            return
+        print(f"Profiler: running cProfile for {frames} frames")
+        self._cprofile_frames = frames
+        self._cprofile_thread = threading.get_ident()
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def stop_cprofile(self):
+        """Finish a cProfile run early with the frames so far. Only acts on the thread cProfile runs on."""
+        if self._cprofile is not None and threading.get_ident() == self._cprofile_thread:
+            self._finish_cprofile()
+
+    def cprofile_thread(self):
+        """Ident of the thread cProfile runs on, None while it is not running."""
+        return self._cprofile_thread if self._cprofile is not None else None
+
+    def _finish_cprofile(self, top=25):
+        self._cprofile.disable()
+        filename = time.strftime("profile_%Y%m%d_%H%M%S.prof")
+        self._cprofile.dump_stats(filename)
+        print(f"Profiler: cProfile stats written to {filename} (open with snakeviz or pstats)")
+        pstats.Stats(self._cprofile).sort_stats("cumulative").print_stats(top)
+        self._cprofile = None
+
+    def install_signal_handler(self):
+        """Request a dump on SIGUSR1 (Linux/macOS) or SIGBREAK / Ctrl+Break (Windows). Call from the main thread."""
+        signum = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+        if signum is not None:
+            signal.signal(signum, self._on_signal)
+
+    def _on_signal(self, signum, frame):
+        self.dump_requested = True
+
+profiler = Profiler()                           # Process-wide profiler used by span and traced
+
+def span(name):
+    """Context manager timing the enclosed block, e.g. with span("network.send"): ..."""
+    return profiler.span(name)
+
+def traced(name):
+    """Decorator recording every call of the function as a span."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(name, start)
+        return wrapper
+    return decorate
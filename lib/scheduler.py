@@ -0,0 +1,171 @@
+import threading
+import time
+import traceback
+from .profiling import profiler
+
+class TrackingLoop:
+    """
+    Runs tracking on its own thread at camera rate, independent of the UI.
+
+    While active, every frame goes through tracker.process_frame and is handed to publish
+    (network, stream server) on the tracking thread; the UI only reads the latest output.
+    While paused the thread waits on an event and touches neither the camera nor the model.
+    """
+    def __init__(self, tracker, publish):
+        """
+        Parameters:
+        - tracker: Tracker, only used from the tracking thread while active
+        - publish: callable(tracking_data, trace), called for every processed frame
+        """
+        self.tracker = tracker
+        self.publish = publish
+        self.with_images = False                # Also produce color and depth images (testing mode)
+        self.latest = (0, None)                 # (sequence, process_frame output), replaced per frame
+        self.cprofile_frames = 0                # Set to run cProfile on the tracking thread for that many frames
+        self.retry_delay = 1.0                  # Seconds to wait after a failed frame
+        self._active = threading.Event()
+        self._paused = threading.Event()        # Set by the thread once it waits for _active (cProfile stopped)
+        self._lock = threading.Lock()           # Held while a frame is processed
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="tracking", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread after the frame in progress."""
+        if self._thread is None:
+            return
+        self._running = False
+        self._active.set()
+        self._thread.join()
+        self._thread = None
+
+    def active(self):
+        return self._active.is_set()
+
+    def set_active(self, active, with_images=False):
+        """
+        Resume or pause tracking. Pausing returns once the frame in progress is done, and ends
+        a cProfile run of the tracking thread (its stats cover the frames so far).
+        """
+        self.with_images = with_images
+        if active and not self._active.is_set():
+            self.latest = (self.latest[0], None)    # Never show a frame from before the pause
+            self._active.set()
+        elif not active and self._active.is_set():
+            self._active.clear()
+            with self._lock:
+                pass
+            if self._thread is not None and profiler.cprofile_thread() == self._thread.ident:
+                self._paused.wait()             # cProfile can only be stopped on its own thread
+
+    def _run(self):
+        failures = 0                            # Consecutive frames that raised
+        while self._running:
+            if not self._active.is_set():
+                profiler.stop_cprofile()        # Pausing ends a cProfile run of this thread
+                self._paused.set()
+                self._active.wait()
+                self._paused.clear()
+                continue
+            time.sleep(self.tracker.idle_delay())   # Idle poll rate of the activity gate, outside the lock
+            with self._lock:
+                if not self._running or not self._active.is_set():
+                    continue
+                start = time.perf_counter_ns()
+                if self.cprofile_frames:
+                    profiler.start_cprofile(self.cprofile_frames)   # cProfile only sees the thread it runs on
+                    self.cprofile_frames = 0
+                try:
+                    output = self.tracker.process_frame(with_images=self.with_images)
+                    self.publish(output[0], self.tracker.trace)
+                    failures = 0
+                except RuntimeError as e:       # e.g. camera unplugged
+                    output = None
+                    failures += 1
+                    print(f"Tracking: {e}")
+                except Exception as e:          # A bug must not silently end tracking, keep the thread alive
+                    output = None
+                    failures += 1
+                    print(f"Tracking: frame failed: {e!r}")
+                    if failures == 1:
+                        traceback.print_exc()   # Once per run of failures, not every retry
+                if output is not None:
+                    self.latest = (self.latest[0] + 1, output)
+                profiler.end_frame(start, "tracking.frame")
+            if output is None:
+                time.sleep(self.retry_delay)    # Retry without spinning (and unlocked)
+
+class BackgroundTasks:
+    """Runs config actions (marker generation, calibration) on worker threads so the window stays responsive."""
+    def __init__(self):
+        self._threads = {}                      # {name: Thread}
+
+    def submit(self, name, function):
+        """Start function on a new thread unless a task with the same name is still running."""
+        if self.running(name):
+            print(f"{name} is already running.")
+            return False
+        thread = threading.Thread(target=self._run, args=(name, function), name=f"task-{name}", daemon=True)
+        self._threads[name] = thread
+        thread.start()
+        return True
+
+    def _run(self, name, function):
+        try:
+            function()
+        except Exception as e:
+            print(f"{name} failed: {e}")
+
+    def running(self, name=None):
+        """True while the named task (or any task, for None) is running."""
+        if name is not None:
+            return name in self._threads and self._threads[name].is_alive()
+        return any(thread.is_alive() for thread in self._threads.values())
+
+    def status(self):
+        """Names of the running tasks, in start order."""
+        return tuple(name for name, thread in self._threads.items() if thread.is_alive())
+
+class RefreshLimiter:
+    """
+    Decides when the window redraws: only when what it shows changed, and at most max_fps
+    times per second. delay gives the cv2.waitKey timeout until the next check.
+    """
+    def __init__(self, max_fps=30, idle_poll=0.05):
+        """
+        Parameters:
+        - max_fps: float, redraw rate cap
+        - idle_poll: float, seconds between checks while nothing streams (static screens)
+        """
+        self.period = 1.0 / max_fps
+        self.idle_poll = idle_poll
+        self.shown = None                       # Content key of what the window shows
+        self.next_draw = 0.0
+
+    def should_draw(self, content):
+        """
+        Parameters:
+        - content: hashable key of what would be drawn now, e.g. (mode, frame sequence)
+
+        Returns:
+        - draw: bool, True if the content changed and the rate cap allows a redraw (then draw it)
+        """
+        now = time.perf_counter()
+        if content == self.shown or now < self.next_draw:
+            return False
+        self.shown = content
+        self.next_draw = now + self.period
+        return True
+
+    def delay(self, streaming):
+        """waitKey timeout (ms): the next redraw slot while frames stream, idle_poll otherwise."""
+        if not streaming:
+            return max(1, round(1000 * self.idle_poll))
+        remaining = self.next_draw - time.perf_counter()
+        return max(1, round(1000 * (remaining if remaining > 0 else self.period / 4)))
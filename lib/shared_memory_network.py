@@ -0,0 +1,186 @@
+"""
+Shared-memory output channel for a Unity process on the same machine.
+
+Instead of JSON over loopback UDP, every update is written as a fixed-size binary slot
+into a memory-mapped file. A reader maps the same file and polls the latest slot with
+plain memory reads: no syscalls, no parsing.
+
+File layout (little-endian):
+- Header, HEADER_SIZE bytes: magic b"LSTRACK1", version u32, slot count u32,
+  max tracks per slot u32, track record size u32, slot size u32, generation u32,
+  latest sequence number u64 (0 = nothing written yet), zero padding.
+- slot_count slots, the slot for sequence number n sits at index n % slot_count:
+  seqlock u64, sequence number u64, camera frame number i64, capture timestamp f64 (ms),
+  track count u32, padding u32, then max_tracks track records.
+- Track record: id i32, has position u32, x/y/z f32 (Unity frame, NaN without position),
+  bbox x_min/y_min/x_max/y_max i32.
+
+The writer makes a slot's seqlock odd before writing it and even again afterwards, then
+publishes the sequence number in the header. A reader copies a slot and accepts it only
+if the seqlock was even and unchanged around the copy and the slot holds the sequence
+number it asked for. This relies on stores becoming
+visible in program order, which holds on x86/x64.
+
+The file is reused across runs, so a reader (Unity) can keep it mapped while the tracker
+restarts; it is never truncated, only resized when the layout needs a different size
+(which fails on Windows while a reader has it mapped). Each writer start clears the slots,
+resets the latest sequence number to 0 and increments generation. A reader that sees the
+generation change starts over from sequence number 1.
+"""
+import mmap
+import os
+import struct
+import tempfile
+from .latency import LatencyLog
+from .profiling import traced
+
+MAGIC = b"LSTRACK1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIIIQ")                # magic, version, slots, max tracks, record size, slot size, generation, latest
+HEADER_SIZE = 64
+GENERATION = struct.Struct("<I")
+GENERATION_OFFSET = 28                              # offset of the writer generation in the header
+LATEST = struct.Struct("<Q")
+LATEST_OFFSET = 32                                  # offset of the latest sequence number in the header
+SLOT_HEADER = struct.Struct("<QQqdII")              # seqlock, sequence, frame, capture_ts, count, pad
+SEQLOCK = struct.Struct("<Q")
+RECORD = struct.Struct("<iI3f4i")                   # id, has position, x, y, z, bbox
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "livingstream_tracking.mmap")
+NAN = float("nan")
+
+class SharedMemoryNetwork:
+    """Drop-in alternative to Network that publishes tracking data into a memory-mapped ring."""
+    def __init__(self, path=DEFAULT_PATH, max_tracks=8, slot_count=64, latency_log=None):
+        self.path = path                # File shared with the reader (Unity)
+        self.max_tracks = max_tracks    # Tracks per slot, extra tracks are dropped
+        self.slot_count = slot_count    # Ring length, lets readers that fall behind catch up
+        self.slot_size = SLOT_HEADER.size + max_tracks * RECORD.size
+        size = HEADER_SIZE + slot_count * self.slot_size
+        self.latency_log = LatencyLog(latency_log) if latency_log else None     # JSON Lines file of frame traces
+
+        try:
+            f = open(path, "r+b")       # Reuse the file, a reader may still have it mapped
+        except FileNotFoundError:
+            f = open(path, "w+b")
+        with f:
+            if os.fstat(f.fileno()).st_size != size:
+                f.truncate(size)
+            self.mm = mmap.mmap(f.fileno(), size)
+        self.generation = self._next_generation()
+
+        LATEST.pack_into(self.mm, LATEST_OFFSET, 0)
+        self.mm[HEADER_SIZE:size] = bytes(size - HEADER_SIZE)
+        HEADER.pack_into(self.mm, 0, MAGIC, VERSION, slot_count, max_tracks, RECORD.size, self.slot_size,
+                         self.generation, 0)
+        self.sequence = 0               # Sequence number of the last published slot
+
+    def _next_generation(self):
+        """Generation of the previous writer of this file plus one, 1 for a new file."""
+        magic, version, _, _, _, _, generation, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            return 1
+        return generation % 0xFFFFFFFF + 1     # Skips 0 when wrapping around
+
+    @traced("shared_memory.send")
+    def send_tracking_data(self, tracking_data, trace=None):
+        """Write one update into the next ring slot and publish it."""
+        sequence = self.sequence + 1
+        offset = HEADER_SIZE + (sequence % self.slot_count) * self.slot_size
+        lock = SEQLOCK.unpack_from(self.mm, offset)[0]
+        SEQLOCK.pack_into(self.mm, offset, lock + 1)   # odd: write in progress
+
+        tracks = tracking_data[:self.max_tracks]
+        frame = trace.frame_number if trace is not None else -1
+        capture_ts = trace.capture_timestamp if trace is not None else 0.0
+        SLOT_HEADER.pack_into(self.mm, offset, lock + 1, sequence, frame, capture_ts, len(tracks), 0)
+        record_offset = offset + SLOT_HEADER.size
+        for track in tracks:
+            position = track['position']
+            x, y, z = position if position is not None else (NAN, NAN, NAN)
+            RECORD.pack_into(self.mm, record_offset, track['id'], position is not None, x, y, z, *track['bbox'])
+            record_offset += RECORD.size
+
+        SEQLOCK.pack_into(self.mm, offset, lock + 2)   # even: slot is consistent
+        LATEST.pack_into(self.mm, LATEST_OFFSET, sequence)
+        self.sequence = sequence
+
+        if trace is not None:
+            trace.stamp("send")
+            if self.latency_log:
+                self.latency_log.write(trace)
+
+    def close(self):
+        self.mm.close()
+        if self.latency_log:
+            self.latency_log.close()
+
+class SharedMemoryReader:
+    """Reference reader for the shared-memory channel (the Unity side can mirror this in C#)."""
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._map()
+
+    def _map(self):
+        with open(self.path, "r+b") as f:
+            self.mm = mmap.mmap(f.fileno(), 0)
+        magic, version, self.slot_count, self.max_tracks, record_size, self.slot_size, generation, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{self.path} is not a version {VERSION} tracking channel")
+        self.generation = generation    # Writer generation this reader last saw
+
+    def restarted(self):
+        """
+        True once after the writer restarted (new generation): sequence numbers start over at 1.
+        If the new writer uses a different ring layout, the file is mapped again.
+        """
+        generation = GENERATION.unpack_from(self.mm, GENERATION_OFFSET)[0]
+        if generation == self.generation:
+            return False
+        layout = (self.slot_count, self.max_tracks, self.slot_size)
+        _, _, slot_count, max_tracks, _, slot_size, _, _ = HEADER.unpack_from(self.mm, 0)
+        if (slot_count, max_tracks, slot_size) != layout:
+            self.mm.close()
+            self._map()
+        self.generation = generation
+        return True
+
+    def latest_sequence(self):
+        """Sequence number of the newest update, 0 before the first one."""
+        return LATEST.unpack_from(self.mm, LATEST_OFFSET)[0]
+
+    def read(self, sequence, retries=100):
+        """
+        Read the update with the given sequence number.
+
+        Returns:
+        - update: dict with 'sequence', 'frame', 'capture_ts' and 'tracks' (list of dicts like
+          Network sends), or None if the slot was already overwritten by a newer update
+        """
+        offset = HEADER_SIZE + (sequence % self.slot_count) * self.slot_size
+        for _ in range(retries):
+            before = SEQLOCK.unpack_from(self.mm, offset)[0]
+            if before & 1:
+                continue  # Writer is in the middle of this slot
+            data = self.mm[offset:offset + self.slot_size]
+            if SEQLOCK.unpack_from(self.mm, offset)[0] != before:
+                continue  # Slot changed while copying
+            return self._decode(sequence, data)
+        return None
+
+    def read_latest(self):
+        """Read the newest update, or None if nothing was written yet."""
+        sequence = self.latest_sequence()
+        return self.read(sequence) if sequence else None
+
+    def _decode(self, sequence, data):
+        _, slot_sequence, frame, capture_ts, count, _ = SLOT_HEADER.unpack_from(data, 0)
+        if slot_sequence != sequence:
+            return None  # Ring wrapped around, this slot holds a different update
+        tracks = []
+        for index in range(min(count, self.max_tracks)):
+            track_id, has_position, x, y, z, *bbox = RECORD.unpack_from(data, SLOT_HEADER.size + index * RECORD.size)
+            tracks.append({'id': track_id, 'position': [x, y, z] if has_position else None, 'bbox': bbox})
+        return {'sequence': sequence, 'frame': frame, 'capture_ts': capture_ts, 'tracks': tracks}
+
+    def close(self):
+        self.mm.close()
@@ -0,0 +1,181 @@
+"""
+TCP streaming server for dashboards and analytics consumers.
+
+Protocol (newline-delimited JSON, one object per line):
+- The client connects and sends a subscription, e.g. {"fields": ["id", "position"], "rate": 10}.
+  "fields" picks the track fields to receive (all fields if omitted), "rate" caps the
+  updates per second (no cap if omitted or 0).
+- The server answers with {"subscribed": {"fields": [...], "rate": ...}} and then streams
+  {"sequence": n, "frame": f, "capture_ts": t, "tracks": [...]} lines, where sequence counts
+  published updates (a gap means updates were coalesced for that client), and frame and
+  capture_ts are the camera frame number and sensor timestamp (ms) of the update.
+
+Each subscriber only ever holds the latest state: a client that reads slower than the
+tracker publishes skips intermediate updates instead of growing a buffer on the server.
+"""
+import asyncio
+import json
+import threading
+from .profiling import traced
+
+class StreamServer:
+    """Publishes tracking data to any number of TCP subscribers from its own event loop thread."""
+    def __init__(self, host="127.0.0.1", port=5007, poll_interval=0.005, write_buffer_limit=64 * 1024):
+        self.host = host
+        self.port = port                                # Port subscribers connect to
+        self.poll_interval = poll_interval              # Seconds between pickups of the latest update (while subscribed)
+        self.write_buffer_limit = write_buffer_limit    # Bytes buffered per client before it counts as slow
+        self.loop = None
+        self.subscribers = set()
+        self.sequence = 0                               # Number of updates published so far
+        self.latest = None                              # Latest published tracking data
+        self.latest_frame = (-1, None)                  # (camera frame number, capture timestamp) of latest
+        self._encoded = {}                              # Latest update serialized per field selection
+        self._handed_over = 0                           # Number of send_tracking_data calls so far
+        self._pending = (0, None, None)                 # (call number, tracking data, trace) of the latest call
+        self._picked_up = 0                             # Call number of the last published update
+        self._subscribed = None                         # asyncio.Event, set while anyone is subscribed
+        self._start_error = None                        # Exception that stopped the server from listening
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        """Start the event loop thread and listen for subscribers. Raises if the server cannot listen."""
+        if self._thread is not None:
+            return
+        started = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, args=(started,), name="stream-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if self._start_error is not None:
+            error, self._start_error = self._start_error, None
+            self._thread.join()
+            self.loop.close()
+            self._thread = self.loop = None
+            raise error
+        print(f"Stream server listening on {self.host}:{self.port}")
+
+    def _run(self, started):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._subscribed = asyncio.Event()
+            self._server = self.loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+            self.loop.create_task(self._pick_up())
+        except Exception as e:
+            self._start_error = e       # e.g. port in use, start() raises it on the caller's thread
+            return
+        finally:
+            started.set()
+        self.loop.run_forever()
+
+    @traced("stream_server.publish")
+    def send_tracking_data(self, tracking_data, trace=None):
+        """
+        Publish one update to all subscribers. trace is the frame's FrameTrace (frame number and timestamp).
+
+        Called from the tracking loop. This is a single attribute store: no lock, no system call
+        (waking the event loop would be one, and it gives up the GIL to the server thread), so
+        the caller never waits on the server. Updates sent faster than poll_interval are coalesced.
+        """
+        self._handed_over += 1
+        self._pending = (self._handed_over, tracking_data, trace)
+
+    async def _pick_up(self):
+        """Publish the latest handed-over update every poll_interval; sleep while nobody is subscribed."""
+        while True:
+            if not self.subscribers:
+                self._subscribed.clear()
+                await self._subscribed.wait()
+            await asyncio.sleep(self.poll_interval)
+            self._publish_pending()
+
+    def _publish_pending(self):
+        """Make the latest handed-over update the published state, if it is new."""
+        number, tracking_data, trace = self._pending
+        if number == self._picked_up:
+            return
+        self._picked_up = number
+        self.sequence += 1
+        self.latest = tracking_data
+        self.latest_frame = (trace.frame_number, trace.capture_timestamp) if trace is not None else (-1, None)
+        self._encoded = {}
+        for subscriber in self.subscribers:
+            subscriber.updated.set()
+
+    async def _serve(self, reader, writer):
+        subscriber = None
+        try:
+            request = json.loads(await reader.readline() or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("subscription must be a JSON object")
+            fields = request.get("fields")
+            if fields is not None and not (isinstance(fields, list) and all(isinstance(f, str) for f in fields)):
+                raise ValueError("fields must be a list of field names")
+            rate = float(request.get("rate") or 0)
+            subscriber = Subscriber(fields, rate)
+            writer.transport.set_write_buffer_limits(high=self.write_buffer_limit)
+            writer.write(_encode({"subscribed": {"fields": fields, "rate": rate}}))
+            await writer.drain()
+
+            self.subscribers.add(subscriber)
+            self._subscribed.set()
+            self._publish_pending()             # Nothing was picked up while nobody was subscribed
+            if self.latest is not None:
+                subscriber.updated.set()        # Send the current state right away
+            while True:
+                await subscriber.updated.wait()
+                subscriber.updated.clear()
+                writer.write(self._encode_latest(subscriber))
+                await writer.drain()            # A slow client only stalls its own task, updates keep coalescing
+                if subscriber.interval:
+                    await asyncio.sleep(subscriber.interval)
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client went away or the server is closing
+        except (ValueError, TypeError) as e:
+            print(f"Stream server: bad subscription from {writer.get_extra_info('peername')}: {e}")
+        finally:
+            self.subscribers.discard(subscriber)
+            writer.close()
+
+    def _encode_latest(self, subscriber):
+        """Serialize the latest update once per distinct field selection."""
+        key = tuple(subscriber.fields) if subscriber.fields is not None else None
+        message = self._encoded.get(key)
+        if message is None:
+            frame, capture_ts = self.latest_frame
+            message = _encode({"sequence": self.sequence, "frame": frame, "capture_ts": capture_ts,
+                               "tracks": subscriber.select(self.latest)})
+            self._encoded[key] = message
+        return message
+
+    def close(self):
+        """Disconnect all subscribers and stop the server thread."""
+        if self._thread is None:
+            return
+        async def shutdown():
+            self._server.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self._thread = self.loop = None
+
+class Subscriber:
+    """Field selection and rate limit of one connected client."""
+    def __init__(self, fields, rate):
+        self.fields = fields                        # Track fields to send, None for all
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.updated = asyncio.Event()              # Set when a newer state is available
+
+    def select(self, tracking_data):
+        if self.fields is None:
+            return tracking_data
+        return [{field: track[field] for field in self.fields if field in track} for track in tracking_data]
+
+def _encode(message):
+    return (json.dumps(message) + "\n").encode("utf-8")
@@ -0,0 +1,99 @@
+import numpy as np
+
+class TrackTable:
+    """
+    Fixed-capacity table of tracked people backed by preallocated arrays.
+
+    Each slot holds one track ID plus its per-track state. A track that YOLO misses keeps
+    its slot, and its smoothing state, for `grace_frames` frames before it is evicted, so a
+    short occlusion neither resets smoothing nor hands the slot to a newcomer.
+    """
+    FREE = -1                                   # ID stored in unused slots
+
+    def __init__(self, capacity, grace_frames=15):
+        self.capacity = capacity
+        self.grace_frames = grace_frames
+        self.ids = np.full(capacity, self.FREE, dtype=np.int64)     # track ID per slot
+        self.missed = np.zeros(capacity, dtype=np.int32)            # consecutive frames without a detection
+        self.detection = np.full(capacity, -1, dtype=np.int64)      # detection index this frame, -1 if unseen
+        self.depth = np.full(capacity, np.nan)                      # EMA smoothed depth, NaN until first sample
+
+        # Scratch buffers reused by update, so a frame without new tracks allocates only the returned slots
+        self._occupied = np.zeros(capacity, dtype=bool)
+        self._hit = np.zeros(capacity, dtype=bool)
+        self._flag = np.zeros(capacity, dtype=bool)                 # missed, then expired, then detected
+        self._first = np.zeros(capacity, dtype=np.int64)            # first matching detection per slot
+        self._match = np.zeros((capacity, 8), dtype=bool)           # [slots, detections], grown on demand
+        self._new = np.zeros(8, dtype=bool)                         # detections without a slot
+
+    def count(self):
+        """Number of slots holding a track (including tracks within their grace period)."""
+        return int(np.count_nonzero(self.ids != self.FREE))
+
+    def update(self, track_ids, admission_scores=None):
+        """
+        Match this frame's detections to slots, age missing tracks and admit new ones.
+
+        Parameters:
+        - track_ids: 1D int array, the track ID of each detection this frame
+        - admission_scores: 1D float array or None, detections with lower scores are admitted
+          first when there are more new tracks than free slots (None keeps detection order)
+
+        Returns:
+        - slots: 1D int array of the slots detected this frame, in slot order
+        """
+        count = len(track_ids)
+        if count > self._match.shape[1]:
+            self._match = np.zeros((self.capacity, 2 * count), dtype=bool)
+            self._new = np.zeros(2 * count, dtype=bool)
+        match, new = self._match[:, :count], self._new[:count]
+        occupied, hit, flag = self._occupied, self._hit, self._flag
+        np.not_equal(self.ids, self.FREE, out=occupied)
+        self.detection.fill(-1)
+
+        # Step 1. Match detections to the tracks already holding a slot
+        np.equal(self.ids[:, None], track_ids[None, :], out=match)
+        np.logical_and(match, occupied[:, None], out=match)
+        np.any(match, axis=1, out=hit)
+        if count:
+            np.argmax(match, axis=1, out=self._first)
+            np.copyto(self.detection, self._first, where=hit)
+
+        # Step 2. Age tracks that were missed and evict those past the grace period
+        np.logical_not(hit, out=flag)
+        self.missed *= flag                     # Detected tracks start counting again
+        np.logical_and(occupied, flag, out=flag)
+        self.missed += flag
+        np.greater(self.missed, self.grace_frames, out=flag)
+        np.putmask(self.ids, flag, self.FREE)
+        np.putmask(self.missed, flag, 0)
+        np.putmask(self.depth, flag, np.nan)
+
+        # Step 3. Admit new tracks into free slots, best admission score first
+        np.any(match, axis=0, out=new)
+        np.logical_not(new, out=new)
+        if new.any() and (self.ids == self.FREE).any():
+            free = np.flatnonzero(self.ids == self.FREE)
+            candidates = np.flatnonzero(new)
+            if admission_scores is not None and candidates.size > free.size:
+                candidates = candidates[np.argsort(admission_scores[candidates], kind="stable")]
+            candidates = candidates[:free.size]
+            slots = free[:candidates.size]
+            self.ids[slots] = track_ids[candidates]
+            self.detection[slots] = candidates
+
+        np.greater_equal(self.detection, 0, out=flag)
+        return np.flatnonzero(flag)
+
+    def smooth_depth(self, slots, depths, alpha):
+        """EMA smooth new depth samples into the given slot(s) and return the smoothed value(s)."""
+        previous = self.depth[slots]
+        self.depth[slots] = np.where(np.isnan(previous), depths, alpha * depths + (1 - alpha) * previous)
+        return self.depth[slots]
+
+    def reset(self):
+        """Free every slot, e.g. after the camera pipeline restarts."""
+        self.ids.fill(self.FREE)
+        self.missed.fill(0)
+        self.detection.fill(-1)
+        self.depth.fill(np.nan)
@@ -1,45 +1,96 @@
 import importlib
+import threading
+import time
+import traceback
+from collections import namedtuple
 import numpy as np
 import pyrealsense2 as rs                       # python wrapper of d435i SDK
-from ultralytics import YOLO                    # AI for object detect, track, and pose
-import torch                                    # For CUDA detection
+from .detector import Detector
+from .association import TRACKER_BACKENDS, make_associator
+from .track_table import TrackTable
+from .geometry import deproject_pixels, camera_to_unity, unity_to_camera, roi_median_depths, intersect_plane, sdk_deprojection_error
+from .depth_filters import DepthFilterChain
+from .latency import FrameTrace
+from .skeleton import pack_skeleton
+from .activity import ActivityGate
+from .profiling import traced
+from .camera_profiles import STREAM_PROFILES, DEFAULT_STREAM_PROFILE, resolve_stream_profile, enable_streams
+
+# One filtered and aligned frameset waiting for detection
+Capture = namedtuple("Capture", ["frames", "color_image", "depth_frame", "trace"])
 
 class Tracker:
-    def __init__(self, force_cpu=False):
-        self.intrinsics = None                  # Will store camera intrinsics
-        self.pipeline = rs.pipeline()           # Initialize and start RealSense pipeline
+    """
+    Person detection and tracking on the RealSense color and depth streams of one camera.
+
+    Construction is cheap: the camera starts on the first processed frame (or start_pipeline)
+    and the YOLO model is loaded by load_model, or in the background by load_model_async,
+    so the UI can appear before torch and ultralytics are even imported.
+
+    Several Trackers can share one Detector; process_sources then runs a single batched
+    forward pass for all of them while every Tracker keeps its own association state.
+    """
+    def __init__(self, force_cpu=False, stream_profile=DEFAULT_STREAM_PROFILE, depth_filters="none",
+                 depth_decimation=1, bag_file=None, startup_origin=None, detector=None, serial=None,
+                 skeleton_mode=False, position_mode="depth", tracker_backend="botsort", idle_gate=False,
+                 drift_monitor=None, play_area_center=None):
+        if tracker_backend not in TRACKER_BACKENDS:
+            raise ValueError(f"Unknown tracker backend {tracker_backend!r}, expected one of {', '.join(TRACKER_BACKENDS)}")
+        self.startup_origin = startup_origin or time.perf_counter()    # t=0 for the startup timeline
+        self.startup_timeline = {}              # {event: seconds since startup_origin}, first occurrence only
+        self.intrinsics = None                  # Color camera intrinsics, set when the pipeline starts
+        self.play_area_center = play_area_center    # Unity (x, y, z) of the play-area center, None for image center
+        self.play_area_pixel = None             # play_area_center in the color image, once calibration and intrinsics are known
+        self.pipeline = rs.pipeline()           # RealSense pipeline, started on demand
+        self.running = False                    # True while the pipeline is streaming
         self.config = rs.config()
-        self.config.enable_stream(rs.stream.depth, 1280, 720, rs.format.z16, 30)   # up to 1280x720
-        self.config.enable_stream(rs.stream.color, 1280, 720, rs.format.bgr8, 30)  # up to 1920x1080
-        #self.config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 15)
-        #self.config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 15)
-        self.profile = self.pipeline.start(self.config)
+        self.bag_file = bag_file                # Recorded .bag session to play back instead of a live camera
+        if serial is not None:
+            self.config.enable_device(serial)   # Pick one camera when several are connected
+        if bag_file is not None:
+            self.config.enable_device_from_file(bag_file, repeat_playback=False)
+            self.stream_profile = stream_profile    # The recording decides resolution and fps
+        else:
+            self.stream_profile = resolve_stream_profile(stream_profile, serial)    # See STREAM_PROFILES
+        enable_streams(self.config, self.stream_profile, from_file=bag_file is not None)
+        if bag_file is not None:
+            self.start_pipeline()               # Only the recording knows its frame size
+        else:
+            self.frame_width, self.frame_height, _ = STREAM_PROFILES[self.stream_profile]["color"]
 
+        # Depth post-processing (see DEPTH_FILTER_PRESETS), runs before alignment
+        self.depth_filters = DepthFilterChain(depth_filters, depth_decimation)
         self.align = rs.align(rs.stream.color)  # Aligns depth to color
         self.colorizer = rs.colorizer()         # Create colorizer for depth visualization
 
-        if not force_cpu and torch.cuda.is_available():     # Check for CUDA availability
-            self.device = 'cuda'
-        else:
-            self.device = 'cpu'                             # Fallback to CPU
-
-        self.model = YOLO('yolo11n-pose.pt').to(self.device)
+        self.detector = detector or Detector(force_cpu=force_cpu)  # YOLO pose model, possibly shared
+        self.tracker_backend = tracker_backend  # Association backend, one of TRACKER_BACKENDS in association.py
+        self.associator = None                  # Per-source association state, created once the model is loaded
+        self.activity_gate = ActivityGate() if idle_gate else None  # Skips YOLO while the floor is empty
+        self.drift_monitor = drift_monitor      # DriftMonitor that gets a frame copy every few seconds, or None
 
         self.person_class = 0                   # YOLO - Class 0 is 'person'
         self.person_confidence = 0.6            # YOLO - Percent confident of detection
         self.feet_confidence = 0.6              # YOLO - Percent confident of keypoint
+        self.skeleton_mode = skeleton_mode      # Also send all 17 keypoints in 3D per track (see skeleton.py)
+        self.keypoint_confidence = 0.5          # Skeleton mode - keypoints below this get no position
+        self.position_mode = position_mode      # "depth": sample depth at the feet, "floor": intersect the feet ray with the floor plane
+        self.ankle_height = 0.08                # Floor mode - height of the ankle keypoints above the floor (in meters)
         self.max_tracks = 3                     # Maximum number of people to track
-        self.active_tracks = set()              # Keep track of currently active track IDs
+        self.track_grace_frames = 15            # Frames a missed track keeps its slot before eviction
+        self.track_admission = "center"         # Who gets a free slot when over max_tracks: "center" or "first"
+        self.tracks = TrackTable(self.max_tracks, self.track_grace_frames)
 
         # Region of Interest (ROI)
         self.roi_min_depth = 1                  # min valid depth range (in meters)
         self.roi_max_depth = 4                  # max valid depth range (in meters)
-        self.roi_size = 5                       # Half-size for a 10x10 pixel ROI around feet for depth sampling
-        self.roi_depth_history = {}             # for smoothing (stores depth values for each track, now single EMA value)
-
-        # Get depth scale for converting depth frame to meters
-        depth_sensor = self.profile.get_device().first_depth_sensor()
-        self.depth_scale = depth_sensor.get_depth_scale()  # Typically 0.001 for D435i
+        self.roi_size = self.scale_pixels(5)    # Half-size for a 10x10 pixel ROI (at 1280 wide) around feet for depth sampling
+        self.min_bbox_size = self.scale_pixels(10)  # Skip detections with a smaller bbox side (pixels)
+        self.depth_alpha = 0.2                  # EMA smoothing factor for depth (stored per slot in self.tracks)
+        self.depth_samples = 0                  # ROI depth samples taken (for depth-miss statistics)
+        self.depth_misses = 0                   # ROI depth samples without a single valid depth
+        self.quiet = False                      # True only counts depth misses instead of printing each one
+        self.trace = None                       # FrameTrace (timestamps, frame number) of the last frame
 
         # Load calibration parameters initially
         self.load_calibration()
@@ -56,163 +107,471 @@ class Tracker:
             self.scale = calibration_config.SCALE
             self.rotation_matrix = calibration_config.ROTATION_MATRIX
             self.translation_vector = calibration_config.TRANSLATION_VECTOR
+            self.floor_plane = getattr(calibration_config, "FLOOR_PLANE", None)    # Missing in older calibrations
             print("Loaded transformation: calibration_config.py")
         except ImportError:
             print("calibration_config.py not found. Using default transformation.")
             self.scale = 1.0
             self.rotation_matrix = np.eye(3)
             self.translation_vector = np.zeros(3)
+            self.floor_plane = None
+        if self.position_mode == "floor" and self.floor_plane is None:
+            print("No floor plane in the calibration, positions use sampled depth. Recalibrate for floor mode.")
+        self._locate_play_area()
+
+    def _locate_play_area(self):
+        """Project play_area_center through the calibration into the color image (admission scores)."""
+        self.play_area_pixel = None
+        if self.play_area_center is None or self.intrinsics is None:
+            return
+        point = unity_to_camera([self.play_area_center], self.scale, self.rotation_matrix, self.translation_vector)[0]
+        if point[2] <= 0:
+            print("Play-area center is behind the camera, track admission uses the image center.")
+            return
+        self.play_area_pixel = tuple(rs.rs2_project_point_to_pixel(self.intrinsics, point.tolist()))
+
+    def configure_tracks(self, max_tracks=None, grace_frames=None):
+        """
+        Change max_tracks and/or track_grace_frames and rebuild the track table (drops all current tracks).
+
+        Setting the attributes alone has no effect, the table is sized when it is built.
+        """
+        if max_tracks is not None:
+            self.max_tracks = max_tracks
+        if grace_frames is not None:
+            self.track_grace_frames = grace_frames
+        self.tracks = TrackTable(self.max_tracks, self.track_grace_frames)
+
+    def load_model(self):
+        """Load the YOLO pose model and warm it up with a dummy frame (no-op if already loaded)."""
+        self.detector.load((self.frame_height, self.frame_width), self.mark_startup)
+
+    def load_model_async(self):
+        """
+        Load the model on a background thread; process_frame returns no tracks until it is ready.
+        If loading fails, the reason is in detector.error and the model stays unloaded.
+        """
+        threading.Thread(target=self._load_model_in_background, name="model-loader", daemon=True).start()
+
+    def _load_model_in_background(self):
+        try:
+            self.load_model()
+        except Exception:
+            print(f"Loading the AI model failed: {self.detector.error}")
+            traceback.print_exc()
+
+    @traced("tracker.grab")
+    def grab(self, keep=False, with_depth=True):
+        """
+        Wait for the next frameset, then filter and align it.
+
+        Parameters:
+        - keep: bool, hold the frame memory beyond the SDK frame pool (needed when batching several frames)
+        - with_depth: bool, False skips depth filtering and alignment (Capture.depth_frame is None)
+
+        Returns:
+        - capture: Capture, or None if the frameset lacks a depth or color frame
+        """
+        if not self.running:
+            self.start_pipeline()
 
-    def process_frame(self, with_images=False):
-        """Process a frame and return tracking data, optionally with images."""
         # Get frames and convert to numpy array
         frames = self.pipeline.wait_for_frames()
+        self.mark_startup("first_frame")
+        trace = self._start_trace(frames.get_color_frame())
+        if not with_depth:
+            color_frame = frames.get_color_frame()
+            if not color_frame:
+                self.trace = trace
+                return None
+            if keep:
+                frames.keep()
+            return Capture(frames, np.asanyarray(color_frame.get_data()), None, trace)
+        return self.align_depth(frames, trace, keep)
+
+    @traced("tracker.align")
+    def align_depth(self, frames, trace, keep=False):
+        """
+        Filter the depth of a raw frameset and align it to color.
+
+        Returns:
+        - capture: Capture, or None if the frameset lacks a depth or color frame
+        """
+        frames = self.depth_filters.process(frames)
         aligned_frames = self.align.process(frames)
         depth_frame = aligned_frames.get_depth_frame()
         color_frame = aligned_frames.get_color_frame()
+        trace.stamp("align")
 
         if not depth_frame or not color_frame:
-            return [], None, None, 0 if with_images else []
-        
-        # Get camera intrinsics from the color frame (only once)
-        if self.intrinsics is None:
-            color_profile = color_frame.profile.as_video_stream_profile()
-            self.intrinsics = color_profile.intrinsics
+            self.trace = trace
+            return None
+        if keep:
+            aligned_frames.keep()
+        return Capture(aligned_frames, np.asanyarray(color_frame.get_data()), depth_frame, trace)
 
-        color_image = np.asanyarray(color_frame.get_data())
+    @traced("tracker.process_frame")
+    def process_frame(self, with_images=False):
+        """
+        Process a frame and return tracking data, optionally with images.
 
-        # Convert depth frame to meters once per frame for efficient ROI sampling
-        depth_image = np.asanyarray(depth_frame.get_data(), dtype=np.float32) * self.depth_scale
+        With the activity gate, YOLO only runs while something moves or tracks are active.
+        Otherwise frames are polled at the gate's low rate, checked on the raw depth, and
+        returned without tracks (and without alignment unless images are requested).
+        Never sleeps: wait idle_delay() seconds between calls to keep to the poll rate.
+        """
+        gated = self.activity_gate is not None and self.detector.ready.is_set()
+        idle = self.is_idle()
+        if idle:
+            self.activity_gate.start_poll()     # Low polling rate while the floor is empty, see idle_delay
+        capture = self.grab(with_depth=not gated and self.needs_depth(with_images))
+        if capture is None:
+            return [], None, None, 0
+        aligned = None                          # Aligned capture, if drift sampling already aligned this frame
+        if self.drift_monitor is not None and self.drift_monitor.due():
+            aligned = self._sample_drift(capture)
+        if not self.detector.ready.is_set():
+            self.trace = capture.trace
+            return self._frame_output([], capture, 0, with_images)
+        if gated:
+            depth_frame = capture.frames.get_depth_frame()
+            moving = self.activity_gate.update(depth_frame) if depth_frame else True
+            capture.trace.stamp("activity")
+            skip = not moving and self.activity_gate.idle and self.tracks.count() == 0
+            if skip and not idle and self.associator is not None:
+                self.associator.reset()         # Entering idle: nobody left to keep track of
+            needs_depth = with_images if skip else self.needs_depth(with_images)
+            if needs_depth:
+                capture = aligned or self.align_depth(capture.frames, capture.trace)
+                if capture is None:
+                    return [], None, None, 0
+            if skip:
+                self.trace = capture.trace
+                return self._frame_output([], capture, 0, with_images)
+
+        # Detection with YOLO pose model, association to track IDs happens in track()
+        result = self.detector.predict([capture.color_image])[0]
+        capture.trace.stamp("inference")
+        return self.track(capture, result, with_images)
+
+    def is_idle(self):
+        """True while the activity gate is idle and no track is left (YOLO is skipped)."""
+        return (self.activity_gate is not None and self.detector.ready.is_set() and
+                self.activity_gate.idle and self.tracks.count() == 0)
+
+    def idle_delay(self):
+        """
+        Seconds to wait before the next process_frame: the time until the next idle poll while
+        idle, 0 otherwise. A UI loop can spend it in cv2.waitKey and stay responsive.
+        """
+        return self.activity_gate.poll_delay() if self.is_idle() else 0.0
+
+    def process_batch(self, batch_size, with_images=False):
+        """
+        Process up to batch_size consecutive frames with one forward pass (offline .bag processing).
+
+        Returns:
+        - outputs: list of process_frame return values, in frame order
+
+        Raises RuntimeError when the recording has no frames left.
+        """
+        captures = self.grab_batch(batch_size, self.needs_depth(with_images))
+        results = self.detector.predict([capture.color_image for capture in captures])
+        for capture in captures:
+            capture.trace.stamp("inference")
+        return [self.track(capture, result, with_images) for capture, result in zip(captures, results)]
 
-        # Detection and tracking with YOLO pose model
-        # persist=True enables tracking; add half=True for FP16 if desired
-        results = self.model.track(color_image, persist=True)
+    def grab_batch(self, batch_size, with_depth=True):
+        """
+        Grab up to batch_size consecutive captures, kept beyond the SDK frame pool (offline .bag processing).
+
+        Returns:
+        - captures: list of Capture, shorter than batch_size at the end of the recording
+
+        Raises RuntimeError when the recording has no frames left.
+        """
+        captures = []
+        while len(captures) < batch_size:
+            try:
+                capture = self.grab(keep=True, with_depth=with_depth)
+            except RuntimeError:
+                if not captures:
+                    raise
+                break  # End of the recording, process what we have
+            if capture is not None:
+                captures.append(capture)
+        return captures
+
+    @traced("tracker.track")
+    def track(self, capture, result, with_images=False):
+        """
+        Associate one frame's detections to track IDs and compute positions for Unity.
+
+        Parameters:
+        - capture: Capture from grab
+        - result: ultralytics Results for capture.color_image
+
+        Returns:
+        - the process_frame tuple (tracking_data, color_image, depth_colormap, total_delay)
+        """
+        self.trace = capture.trace
+        depth_frame = capture.depth_frame
+        height, width = capture.color_image.shape[:2]
+        if self.associator is None:
+            self.associator = make_associator(self.tracker_backend, self._frame_rate(), self._floor_positions)
+        result = self.associator.update(result)
+        self.trace.stamp("associate")
+        self.mark_startup("first_tracked_frame")
         tracking_data = []
 
-        # Limit the number of simultaneous tracks to process
-        # Step 1. Collect all valid detections with track IDs
-        current_detections = {}
-        if results[0].boxes is not None:
-            for i in range(len(results[0].boxes)):
-                # Check all conditions using indexed tensor access
-                # SKIP if no track ID, low confidence, or not a person
-                if (results[0].boxes.id is not None and
-                        results[0].boxes.conf[i] >= self.person_confidence and
-                        int(results[0].boxes.cls[i]) == self.person_class):
-                    track_id = int(results[0].boxes.id[i])
-                    current_detections[track_id] = i
-
-        # Step 2. Update active tracks and Remove tracks that are no longer detected
-        self.active_tracks = {track_id for track_id in self.active_tracks if track_id in current_detections}
-    
-        # Step 3. Add new tracks if we have space
-        for track_id in current_detections:
-            if len(self.active_tracks) < self.max_tracks and track_id not in self.active_tracks:
-                self.active_tracks.add(track_id)
-                if len(self.active_tracks) == self.max_tracks:
-                    break
-
-        # Step 4: Process only the max active tracks
-        for track_id in self.active_tracks:
-            if track_id not in current_detections:
-                continue  # Skip if the track is not detected in this frame
-            i = current_detections[track_id]
-
-            # Keep bbox on GPU, extract scalars with .item()
-            bbox = results[0].boxes.xyxy[i]  # [x_min, y_min, x_max, y_max] as tensor
-            x_min = max(0, int(bbox[0].item()))
-            y_min = max(0, int(bbox[1].item()))
-            x_max = min(color_frame.get_width() - 1, int(bbox[2].item()))
-            y_max = min(color_frame.get_height() - 1, int(bbox[3].item()))
-
-            # Skip if bounding box is too small
-            if x_max - x_min < 10 or y_max - y_min < 10:
-                continue
-
-            # Keep keypoints on GPU, extract only ankle data
-            kpts = results[0].keypoints.data[i]  # [17, 3] for x, y, confidence as tensor
-            if kpts.shape != (17, 3):
-                continue  # Ensure key points array is valid
-
-            # Extract feet position from key points (COCO: 15 = left ankle, 16 = right ankle)
-            left_ankle_x = kpts[15, 0].item()  # [x, y, conf]
-            left_ankle_y = kpts[15, 1].item()
-            left_ankle_conf = kpts[15, 2].item()
-            right_ankle_x = kpts[16, 0].item()
-            right_ankle_y = kpts[16, 1].item()
-            right_ankle_conf = kpts[16, 2].item()
-
-            # Determine midpoint based on available feet position
-            if left_ankle_conf > self.feet_confidence and right_ankle_conf > self.feet_confidence:
-                feet_x = (left_ankle_x + right_ankle_x) / 2
-                feet_y = (left_ankle_y + right_ankle_y) / 2
-            elif left_ankle_conf > self.feet_confidence:
-                feet_x, feet_y = left_ankle_x, left_ankle_y
-            elif right_ankle_conf > self.feet_confidence:
-                feet_x, feet_y = right_ankle_x, right_ankle_y
-            else:
-                # Fallback: use bottom center of bounding box
-                feet_x = x_min + (x_max - x_min) / 2
-                feet_y = y_max
-
-            # Vectorized depth sampling in ROI using NumPy slicing
-            x_center = int(feet_x)
-            y_center = int(feet_y)
-            x_start = max(0, x_center - self.roi_size)
-            x_end = min(depth_frame.get_width(), x_center + self.roi_size + 1)
-            y_start = max(0, y_center - self.roi_size)
-            y_end = min(depth_frame.get_height(), y_center + self.roi_size + 1)
-            roi_depths = depth_image[y_start:y_end, x_start:x_end]
-            valid_depths = roi_depths[(roi_depths > self.roi_min_depth) & (roi_depths < self.roi_max_depth)]
-
-            depth = None
-            if valid_depths.size > 0:
-                current_depth = np.median(valid_depths)
-                # Use exponential moving average (EMA) for smoothing instead of list-based median
-                alpha = 0.2  # Smoothing factor
-                if track_id not in self.roi_depth_history:
-                    self.roi_depth_history[track_id] = current_depth
-                else:
-                    self.roi_depth_history[track_id] = alpha * current_depth + (1 - alpha) * self.roi_depth_history[track_id]
-                depth = self.roi_depth_history[track_id]
-            else:
-                print(f"Track ID {track_id}: No valid depths at ({feet_x}, {feet_y})")
-
-            # Deproject to 3D with transformation if depth is valid
-            point_3d = None
-            if depth is not None:
-                # Get 3D point in camera coordinate frame
-                point_3d_camera = rs.rs2_deproject_pixel_to_point(self.intrinsics, [feet_x, feet_y], depth)
-                # Apply transformation for Unity frame: scale, rotate, translate
-                point_3d_transformed = self.scale * (self.rotation_matrix @ point_3d_camera) + self.translation_vector
-                point_3d = point_3d_transformed.tolist()
-            
-            # Add to tracking data
+        # Step 1. Collect all valid detections with track IDs (one device-to-host copy per field)
+        boxes = result.boxes
+        detections = track_ids = np.empty(0, dtype=np.int64)
+        xyxy = np.empty((0, 4))
+        if boxes is not None and boxes.id is not None:
+            # SKIP if no track ID, low confidence, or not a person
+            conf = boxes.conf.cpu().numpy()
+            cls = boxes.cls.cpu().numpy().astype(np.int64)
+            detections = np.flatnonzero((conf >= self.person_confidence) & (cls == self.person_class))
+            track_ids = boxes.id.cpu().numpy().astype(np.int64)[detections]
+            xyxy = boxes.xyxy.cpu().numpy()[detections]
+
+        # Step 2. Match detections to the track table, evict stale tracks and admit new ones
+        admission_scores = self._admission_scores(xyxy, width, height)
+        slots = self.tracks.update(track_ids, admission_scores)
+        j = self.tracks.detection[slots]            # index into the filtered detections
+        i = detections[j]                           # index into the YOLO results
+
+        # Step 3. Keep the tracks detected this frame whose bounding box is large enough
+        bboxes = xyxy[j].astype(np.int64)           # [x_min, y_min, x_max, y_max] per track
+        np.clip(bboxes, 0, [width - 1, height - 1, width - 1, height - 1], out=bboxes)
+        large = ((bboxes[:, 2] - bboxes[:, 0] >= self.min_bbox_size) &
+                 (bboxes[:, 3] - bboxes[:, 1] >= self.min_bbox_size))
+        slots, i, bboxes = slots[large], i[large], bboxes[large]
+        if slots.size == 0:
+            self.trace.stamp("postprocess")
+            return self._frame_output(tracking_data, capture, self._total_delay(result), with_images)
+
+        # Step 4. Feet pixel per track from the ankle keypoints (COCO: 15 = left ankle, 16 = right ankle)
+        keypoints = result.keypoints.data.cpu().numpy()[i]        # [tracks, 17 keypoints, x/y/conf]
+        ankles = keypoints[:, 15:17]
+        confident = ankles[:, :, 2] > self.feet_confidence
+        # Midpoint of the confident ankles, bottom center of the bounding box when neither is confident
+        feet = (ankles[:, :, :2] * confident[:, :, None]).sum(axis=1) / np.maximum(confident.sum(axis=1), 1)[:, None]
+        neither = ~confident.any(axis=1)
+        feet[neither, 0] = bboxes[neither, 0] + (bboxes[neither, 2] - bboxes[neither, 0]) / 2
+        feet[neither, 1] = bboxes[neither, 3]
+
+        if self.uses_floor_plane():
+            # Step 5. Feet stand on the floor: intersect every foot pixel's camera ray with the calibrated floor plane
+            heights = np.where(neither, 0.0, self.ankle_height)    # Bbox bottoms touch the floor, ankles are above it
+            points_camera = intersect_plane(self.intrinsics, feet, self.floor_plane, heights)
+            valid = ~np.isnan(points_camera[:, 0])
+        else:
+            # Step 5. Median depth in the ROI around every foot pixel at once, then EMA smoothing per slot
+            depth_image = np.asanyarray(depth_frame.get_data())    # raw z16, only the ROIs get converted
+            depths = roi_median_depths(depth_image, feet, self.roi_size, self.roi_min_depth, self.roi_max_depth,
+                                       self.depth_scale)
+            valid = ~np.isnan(depths)
+            self.depth_samples += valid.size
+            self.depth_misses += int(valid.size - valid.sum())
+            if not self.quiet:
+                for slot, (feet_x, feet_y) in zip(slots[~valid], feet[~valid]):
+                    print(f"Track ID {self.tracks.ids[slot]}: No valid depths at ({feet_x}, {feet_y})")
+            # Exponential moving average (EMA) kept in the track's slot, so it survives short occlusions
+            depths[valid] = self.tracks.smooth_depth(slots[valid], depths[valid], self.depth_alpha)
+            points_camera = np.full((slots.size, 3), np.nan)
+            if valid.any():
+                points_camera[valid] = deproject_pixels(self.intrinsics, feet[valid], depths[valid])
+
+        # Step 6. Transform to the Unity frame (scale, rotate, translate) in one batch, NaN rows stay NaN
+        positions = camera_to_unity(points_camera, self.scale, self.rotation_matrix, self.translation_vector)
+
+        # Add to tracking data
+        for slot, bbox, position, has_position in zip(slots, bboxes.tolist(), positions.tolist(), valid):
             tracking_data.append({
-                'id': track_id,
-                'position': point_3d if point_3d else None,
-                'bbox': [x_min, y_min, x_max, y_max]
+                'id': int(self.tracks.ids[slot]),
+                'position': position if has_position else None,
+                'bbox': bbox
             })
+        self.trace.stamp("postprocess")
+
+        # Step 7. Skeleton mode: every confident keypoint of every track in one more depth and transform pass
+        if self.skeleton_mode:
+            skeletons = self._skeletons(keypoints, np.asanyarray(depth_frame.get_data()))
+            for track, points, confidences in zip(tracking_data, skeletons, keypoints[:, :, 2]):
+                track['skeleton'] = pack_skeleton(points, confidences)
+            self.trace.stamp("skeleton")
+
+        return self._frame_output(tracking_data, capture, self._total_delay(result), with_images)
+
+    def _sample_drift(self, capture):
+        """
+        Hand a copy of this frame, aligned if it is not yet, to the drift monitor.
+
+        Returns:
+        - capture: the aligned Capture (reuse it instead of aligning again), or None if alignment failed
+        """
+        if capture.depth_frame is None:
+            capture = self.align_depth(capture.frames, capture.trace)
+            if capture is None:
+                return None
+        calibration = (self.scale, self.rotation_matrix, self.translation_vector, self.floor_plane)
+        self.drift_monitor.submit(capture.color_image, capture.depth_frame, self.intrinsics, calibration)
+        return capture
+
+    def uses_floor_plane(self):
+        """True when track positions come from the floor plane instead of sampled depth."""
+        return self.position_mode == "floor" and self.floor_plane is not None
 
-        # Clean up depth history for tracks that are no longer active
-        self.roi_depth_history = {k: v for k, v in self.roi_depth_history.items() if k in self.active_tracks}
+    def needs_depth(self, with_images=False):
+        """Whether a frame needs the filtered and aligned depth (floor mode alone only needs color)."""
+        return with_images or self.skeleton_mode or not self.uses_floor_plane()
 
+    def _floor_positions(self, xyxy):
+        """Camera-frame floor point below each box (bottom center ray), or None without a floor plane."""
+        if self.floor_plane is None:
+            return None
+        bottoms = np.column_stack(((xyxy[:, 0] + xyxy[:, 2]) / 2, xyxy[:, 3]))
+        return intersect_plane(self.intrinsics, bottoms, self.floor_plane)
+
+    @traced("tracker.skeleton")
+    def _skeletons(self, keypoints, depth_image):
+        """
+        Unity-frame positions of all confident keypoints of all tracks, with one ROI depth pass.
+
+        Parameters:
+        - keypoints: (tracks, 17, 3) array of pixel x, y and confidence per keypoint
+        - depth_image: raw z16 depth image aligned to color
+
+        Returns:
+        - points: (tracks, 17, 3) array of Unity-frame positions, NaN where the keypoint is not
+          confident or has no valid depth
+        """
+        points = np.full((*keypoints.shape[:2], 3), np.nan)
+        confident = keypoints[:, :, 2] > self.keypoint_confidence
+        if not confident.any():
+            return points
+        pixels = keypoints[confident][:, :2]
+        depths = roi_median_depths(depth_image, pixels, self.roi_size, self.roi_min_depth, self.roi_max_depth,
+                                   self.depth_scale)
+        valid = ~np.isnan(depths)
+        located = np.full((len(pixels), 3), np.nan)
+        if valid.any():
+            points_camera = deproject_pixels(self.intrinsics, pixels[valid], depths[valid])
+            located[valid] = camera_to_unity(points_camera, self.scale, self.rotation_matrix, self.translation_vector)
+        points[confident] = located
+        return points
+
+    def _total_delay(self, result):
+        """YOLO pre-process, inference and post-process time (ms, per image when batched)."""
         # Extract timing information
-        preprocess_time = results[0].speed['preprocess']
-        inference_time = results[0].speed['inference']
-        postprocess_time = results[0].speed['postprocess']
-        total_delay = preprocess_time + inference_time + postprocess_time
+        preprocess_time = result.speed['preprocess']
+        inference_time = result.speed['inference']
+        postprocess_time = result.speed['postprocess']
+        return preprocess_time + inference_time + postprocess_time
 
+    def _frame_output(self, tracking_data, capture, total_delay, with_images):
+        """Build the process_frame return value."""
         # if testing mode, send images
         if with_images:
             # Create depth colormap for visualization
-            depth_colormap = np.asanyarray(self.colorizer.colorize(depth_frame).get_data())
-            return tracking_data, color_image, depth_colormap, total_delay
+            depth_colormap = np.asanyarray(self.colorizer.colorize(capture.depth_frame).get_data())
+            return tracking_data, capture.color_image, depth_colormap, total_delay
         return tracking_data, None, None, total_delay
 
+    def mark_startup(self, event):
+        """Record the first time a startup event happens and print it."""
+        if event not in self.startup_timeline:
+            elapsed = time.perf_counter() - self.startup_origin
+            self.startup_timeline[event] = elapsed
+            print(f"Startup: {event} after {elapsed:.2f}s")
+
+    def _start_trace(self, color_frame):
+        """Start a FrameTrace from the hardware timestamp and frame number of a freshly arrived frame."""
+        if not color_frame:
+            return FrameTrace(-1, 0.0, False)
+        domain = color_frame.get_frame_timestamp_domain()
+        host_clock = domain in (rs.timestamp_domain.global_time, rs.timestamp_domain.system_time)
+        return FrameTrace(color_frame.get_frame_number(), color_frame.get_timestamp(), host_clock)
+
+    def _admission_scores(self, xyxy, width, height):
+        """Score detections for a free slot: distance of the bbox bottom center to the play-area center."""
+        if self.track_admission != "center":
+            return None  # "first" keeps YOLO's detection order
+        center_x, center_y = self.play_area_pixel or (width / 2, height / 2)
+        feet_x = (xyxy[:, 0] + xyxy[:, 2]) / 2
+        return np.hypot(feet_x - center_x, xyxy[:, 3] - center_y)
+
+    def _frame_rate(self):
+        """Camera fps of the active stream, used to size the association's lost-track buffer."""
+        if self.running:
+            return self.profile.get_stream(rs.stream.color).fps()
+        return STREAM_PROFILES[self.stream_profile]["color"][2]
+
+    def scale_pixels(self, value):
+        """Scale a pixel size tuned for 1280-wide color frames to the active stream profile."""
+        return max(1, round(value * self.frame_width / 1280))
+
     def stop(self):
-        self.pipeline.stop()
+        """Stop the RealSense pipeline if it is running."""
+        if self.running:
+            self.pipeline.stop()
+            self.running = False
+        if self.activity_gate is not None:
+            self.activity_gate.reset()
+        self.tracks.reset()
+        if self.associator is not None:
+            self.associator.reset()
 
     def start_pipeline(self):
-        """ReStart the RealSense pipeline after config"""
-        self.pipeline.start(self.config)
\ No newline at end of file
+        """(Re)Start the RealSense pipeline, e.g. after config"""
+        if self.running:
+            return
+        self.profile = self.pipeline.start(self.config)
+        self.running = True
+        self.mark_startup("pipeline_started")
+
+        # Get depth scale for converting depth frame to meters
+        depth_sensor = self.profile.get_device().first_depth_sensor()
+        self.depth_scale = depth_sensor.get_depth_scale()  # Typically 0.001 for D435i
+
+        # Intrinsics and frame size follow whatever profile is streaming
+        color_profile = self.profile.get_stream(rs.stream.color).as_video_stream_profile()
+        self.intrinsics = color_profile.get_intrinsics()
+        self.frame_width, self.frame_height = self.intrinsics.width, self.intrinsics.height
+        if sdk_deprojection_error(self.intrinsics) > 1e-4:
+            print(f"Warning: deprojection differs from the RealSense SDK for distortion model {self.intrinsics.model}")
+        if hasattr(self, "scale"):
+            self._locate_play_area()            # A recording starts in __init__, before the calibration is loaded
+        if self.bag_file is not None:
+            # Deliver every recorded frame as fast as we can process it instead of at capture rate
+            self.profile.get_device().as_playback().set_real_time(False)
+
+def process_sources(trackers, with_images=False):
+    """
+    Process one frame from each Tracker with a single batched forward pass.
+
+    All trackers must share one Detector. Association and track tables stay per Tracker,
+    so track IDs from different cameras never collide.
+
+    Unlike process_frame, every frame is detected: the trackers' activity gate and drift
+    monitor are not applied, so do not combine this with idle_gate or a drift_monitor.
+
+    Returns:
+    - outputs: list of process_frame return values, one per tracker
+    """
+    detector = trackers[0].detector
+    captures = [tracker.grab(with_depth=tracker.needs_depth(with_images)) for tracker in trackers]
+    ready = [i for i, capture in enumerate(captures) if capture is not None]
+    if not detector.ready.is_set():
+        ready = []
+
+    outputs = [([], None, None, 0) if capture is None else trackers[i]._frame_output([], capture, 0, with_images)
+               for i, capture in enumerate(captures)]
+    if ready:
+        results = detector.predict([captures[i].color_image for i in ready])
+        for i, result in zip(ready, results):
+            captures[i].trace.stamp("inference")
+            outputs[i] = trackers[i].track(captures[i], result, with_images)
+    return outputs
@@ -3,6 +3,7 @@ import numpy as np
 from .ui_utils import UIUtils
 from .ui_elements import UIElements
 from .ui_settings import DEFAULT_HEIGHT
+from .profiling import traced
 
 class UI:
     def __init__(self):
@@ -24,6 +25,7 @@ class UI:
         self.calibrate_requested = False
         self.create_markers_requested = False
 
+    @traced("ui.home_screen")
     def create_home_screen(self):
         """Create the home screen with centered elements."""
         frame = np.full((self.window_height, self.window_width, 3), (100, 100, 100), dtype=np.uint8)
@@ -70,8 +72,9 @@ class UI:
 
         return frame
 
-    def create_config_screen(self):
-        """Create the configuration screen with options for markers and calibration."""
+    @traced("ui.config_screen")
+    def create_config_screen(self, status=None):
+        """Create the configuration screen with options for markers and calibration. status shows running tasks."""
         frame = np.full((self.window_height, self.window_width, 3), (100, 100, 100), dtype=np.uint8)
 
         # Clear previous buttons
@@ -107,10 +110,19 @@ class UI:
             lambda: self.set_mode("home")
         )
 
+        # Status of running config actions (e.g., calibration waiting for input in the console)
+        if status:
+            status_y = back_btn_y + self.ui_utils.get_scaled_button_size()[1] + 2 * padding
+            self.ui_elements.create_title_text(frame, status, (0, 0, 0), (None, status_y))
+
         return frame
 
-    def create_live_screen(self, device, total_delay):
-        """Create the live screen with centered elements."""
+    @traced("ui.live_screen")
+    def create_live_screen(self, device, total_delay, warning=None, model_error=None):
+        """
+        Create the live screen with centered elements. device is None while the AI model is loading,
+        model_error is the reason the model failed to load (shown instead of the loading message).
+        """
         frame = np.full((self.window_height, self.window_width, 3), (100, 100, 100), dtype=np.uint8)
 
         # Clear previous buttons
@@ -119,8 +131,14 @@ class UI:
         # Text (centered vertically and horizontally)
         self.ui_elements.create_title_text(frame, "Sending data to Unity...", (0, 0, 0),
                                            (None, self.ui_utils.scale_point(0, 200)[1]))
-        self.ui_elements.create_title_text(frame, f"AI using {device} with delay of {total_delay:.1f}ms",
-                                           (0, 0, 0), (None, self.ui_utils.scale_point(0, 300)[1]))
+        if model_error:
+            self.ui_elements.create_title_text(frame, f"AI model failed to load: {model_error}", (0, 0, 255),
+                                               (None, self.ui_utils.scale_point(0, 300)[1]))
+        else:
+            status = "Loading AI model..." if device is None else f"AI using {device} with delay of {total_delay:.1f}ms"
+            self.ui_elements.create_title_text(frame, status, (0, 0, 0), (None, self.ui_utils.scale_point(0, 300)[1]))
+        if warning:
+            self.ui_elements.create_title_text(frame, warning, (0, 0, 255), (None, self.ui_utils.scale_point(0, 400)[1]))
 
         # Back button
         btn_width, _ = self.ui_utils.get_scaled_button_size()
@@ -133,18 +151,21 @@ class UI:
 
         return frame
 
-    def display_tracking_frame(self, color_image, depth_colormap, tracking_data):
-        """Draw tracking info on color_image and display with depth_colormap."""
+    @traced("ui.tracking_frame")
+    def display_tracking_frame(self, color_image, depth_colormap, tracking_data, warning=None):
+        """Draw tracking info on color_image and display with depth_colormap. warning is shown on top in red."""
         color_image_resized = cv2.resize(color_image, (self.window_width // 2, self.window_height))
         depth_colormap_resized = cv2.resize(depth_colormap, (self.window_width // 2, self.window_height))
 
+        # Bboxes are in camera pixels, so scale them by whatever stream profile is active
+        scale_x = (self.window_width // 2) / color_image.shape[1]
+        scale_y = self.window_height / color_image.shape[0]
+
         for track in tracking_data:
             x_min, y_min, x_max, y_max = track['bbox']
             track_id = track['id']
             position = track['position']
 
-            scale_x = (self.window_width // 2) / color_image.shape[1]
-            scale_y = self.window_height / color_image.shape[0]
             x_min, y_min = int(x_min * scale_x), int(y_min * scale_y)
             x_max, y_max = int(x_max * scale_x), int(y_max * scale_y)
 
@@ -168,6 +189,9 @@ class UI:
                                                   (x_min + self.ui_utils.scale_value(5, 'x'), y_min + self.ui_utils.scale_value(50, 'y')))
 
         display_image = np.hstack((color_image_resized, depth_colormap_resized))
+        if warning:
+            self.ui_elements.create_title_text(display_image, warning, (0, 0, 255),
+                                               (None, self.ui_utils.scale_point(0, 50)[1]))
         self.ui_elements.clear_buttons()
 
         btn_width, _ = self.ui_utils.get_scaled_button_size()
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from lib.association import FloorAssociator, _iou
+
+class Boxes:
+    """The parts of ultralytics Boxes the associators use."""
+    def __init__(self, data):
+        data = np.asarray(data, dtype=np.float64).reshape(-1, data.shape[1] if len(data) else 6)
+        self.xyxy = data[:, :4]
+        self.id = data[:, 4] if data.shape[1] == 7 else None
+        self.conf = data[:, -2]
+        self.cls = data[:, -1]
+        self.data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self
+
+    def __len__(self):
+        return len(self.data)
+
+class Results:
+    def __init__(self, data):
+        self.boxes = Boxes(np.asarray(data, dtype=np.float64))
+
+    def __getitem__(self, index):
+        return Results(self.boxes.data[index])
+
+    def update(self, boxes):
+        self.boxes = Boxes(np.asarray(boxes))
+
+def detections(*boxes, conf=0.9):
+    return Results([[*box, conf, 0] for box in boxes] or np.empty((0, 6)))
+
+def ids(result):
+    return result.boxes.id.astype(int).tolist() if result.boxes.id is not None else []
+
+@pytest.fixture
+def associator():
+    pytest.importorskip("lap")
+    pytest.importorskip("torch")
+    return FloorAssociator(frame_rate=30)
+
+def test_iou():
+    a = np.array([[0, 0, 10, 10], [0, 0, 10, 10]], dtype=np.float64)
+    b = np.array([[0, 0, 10, 10], [20, 20, 30, 30], [5, 0, 15, 10]], dtype=np.float64)
+    np.testing.assert_allclose(_iou(a, b), [[1.0, 0.0, 1 / 3], [1.0, 0.0, 1 / 3]])
+    assert _iou(np.empty((0, 4)), b).shape == (0, 3)
+
+def test_overlapping_boxes_keep_their_ids(associator):
+    assert ids(associator.update(detections([0, 0, 100, 200], [300, 0, 400, 200]))) == [1, 2]
+    assert ids(associator.update(detections([305, 0, 405, 200], [5, 0, 105, 200]))) == [2, 1]
+
+def test_weak_detections_do_not_start_tracks(associator):
+    assert ids(associator.update(detections([0, 0, 100, 200], conf=0.1))) == []
+    assert ids(associator.update(detections([0, 0, 100, 200], conf=0.9))) == [1]
+    assert ids(associator.update(detections([0, 0, 100, 200], conf=0.1))) == [1]    # But extend existing ones
+
+def test_disjoint_box_starts_a_new_track(associator):
+    associator.update(detections([0, 0, 100, 200]))
+    assert ids(associator.update(detections([500, 0, 600, 200]))) == [2]
+
+def test_floor_match_at_the_edge_of_the_gate(associator):
+    positions = {}
+    associator.locate = lambda xyxy: np.array([positions[x] for x in xyxy[:, 0]])
+    positions[0.0] = [0.0, 0.0, 3.0]
+    associator.max_speed = 0.0                                  # Gate is base_distance whatever the age
+    associator.update(detections([0, 0, 100, 200]))
+    positions[500.0] = [associator.base_distance, 0.0, 3.0]     # No overlap, on the gate: cost is MAX_FEASIBLE_COST
+    assert ids(associator.update(detections([500, 0, 600, 200]))) == [1]
+
+def test_floor_match_outside_the_gate_starts_a_new_track(associator):
+    positions = {0.0: [0.0, 0.0, 3.0], 500.0: [1.0, 0.0, 3.0]}
+    associator.locate = lambda xyxy: np.array([positions[x] for x in xyxy[:, 0]])
+    associator.update(detections([0, 0, 100, 200]))
+    assert ids(associator.update(detections([500, 0, 600, 200]))) == [2]
+
+def test_lost_tracks_are_forgotten_after_max_age(associator):
+    associator.update(detections([0, 0, 100, 200]))
+    for _ in range(associator.max_age):
+        associator.update(detections())
+    assert ids(associator.update(detections([0, 0, 100, 200]))) == [1]
+    for _ in range(associator.max_age + 1):
+        associator.update(detections())
+    assert ids(associator.update(detections([0, 0, 100, 200]))) == [2]
@@ -0,0 +1,77 @@
+from collections import namedtuple
+import pytest
+from lib.latency import FrameTrace
+from tools.batch_sessions import RunRecorder, parse_sweep, plan_shards, output_name
+
+Capture = namedtuple("Capture", ["frames", "color_image", "depth_frame", "trace"])     # As in lib/tracker.py
+
+def test_parse_sweep_builds_all_combinations():
+    param_sets = parse_sweep(["person_confidence=0.5,0.6", "roi_size=3,5,8"])
+    assert len(param_sets) == 6
+    assert param_sets[0] == {"person_confidence": 0.5, "roi_size": 3}
+    assert param_sets[-1] == {"person_confidence": 0.6, "roi_size": 8}
+    assert isinstance(param_sets[0]["roi_size"], int)
+
+def test_parse_sweep_without_specs_is_one_default_run():
+    assert parse_sweep([]) == [{}]
+
+@pytest.mark.parametrize("spec", ["unknown=1,2", "roi_size=", "roi_size"])
+def test_parse_sweep_rejects_bad_specs(spec):
+    with pytest.raises(SystemExit):
+        parse_sweep([spec])
+
+def test_plan_shards_one_shard_per_session_when_workers_are_busy():
+    param_sets = parse_sweep(["roi_size=3,5,8"])
+    shards = plan_shards(["a.bag", "b.bag"], param_sets, workers=2)
+    assert shards == [("a.bag", param_sets), ("b.bag", param_sets)]
+
+def test_plan_shards_splits_combinations_for_idle_workers():
+    param_sets = parse_sweep(["roi_size=1,2,3,4,5"])
+    shards = plan_shards(["a.bag"], param_sets, workers=2)
+    assert [len(chunk) for _, chunk in shards] == [3, 2]
+    assert [params for _, chunk in shards for params in chunk] == param_sets
+
+def test_plan_shards_never_splits_below_one_combination():
+    shards = plan_shards(["a.bag"], [{"roi_size": 3}, {"roi_size": 5}], workers=16)
+    assert [len(chunk) for _, chunk in shards] == [1, 1]
+
+def test_output_name():
+    assert output_name("recordings/night1.bag", {"person_confidence": 0.6, "roi_size": 5}) == \
+        "night1__person_confidence=0.6_roi_size=5.npz"
+    assert output_name("night1.bag", {}) == "night1__default.npz"
+
+class FakeTracker:
+    """The parts of Tracker RunRecorder uses; track() stamps like the real one."""
+    def __init__(self):
+        self.max_tracks = 3
+        self.track_grace_frames = 15
+        self.person_confidence = 0.6
+        self.depth_filters = object()
+        self.activity_gate = object()
+        self.trace = None
+
+    def configure_tracks(self):
+        self.tracks = object()
+
+    def _frame_rate(self):
+        return 30
+
+    def track(self, capture, result, with_images=False):
+        self.trace = capture.trace
+        self.trace.stamp("associate")
+        self.trace.stamp("postprocess")
+        return [{'id': 1, 'position': [0.0, 0.0, 2.0], 'bbox': [1, 2, 3, 4]}], None, None, 0
+
+def test_sweep_runs_stamp_their_own_traces():
+    tracker = FakeTracker()
+    runs = [RunRecorder(tracker, {"person_confidence": value}) for value in (0.5, 0.6, 0.7)]
+    capture = Capture(None, None, None, FrameTrace(7, 100.0, host_clock=False))
+    capture.trace.stamp("inference")
+    for run in runs:
+        run.add(capture, None)
+    assert [name for name, _ in capture.trace.stages] == ["arrival", "inference"]
+    for run in runs:
+        assert [name for name, _ in run.tracker.trace.stages] == ["arrival", "inference", "associate", "postprocess"]
+        assert run.tracker.depth_filters is None and run.tracker.activity_gate is None
+        assert run.rows[0][:3] == (7, 100.0, 1)
+    assert tracker.person_confidence == 0.6
@@ -0,0 +1,39 @@
+import types
+import pytest
+
+pytest.importorskip("pyrealsense2")
+from lib import camera_profiles
+from lib.camera_profiles import resolve_stream_profile, DEFAULT_STREAM_PROFILE
+
+class FakeDevice:
+    def __init__(self, serial, modes):
+        self.serial = serial
+        self.modes = modes                  # {stream name: set of (width, height, fps)}
+
+    def get_info(self, info):
+        return self.serial
+
+@pytest.fixture
+def cameras(monkeypatch):
+    devices = [FakeDevice("111", {"depth": {(848, 480, 30)}, "color": {(848, 480, 30)}}),
+               FakeDevice("222", {"depth": {(848, 480, 60)}, "color": {(848, 480, 60)}})]
+    fake_rs = types.SimpleNamespace(context=lambda: types.SimpleNamespace(query_devices=lambda: devices),
+                                    camera_info=types.SimpleNamespace(serial_number="serial_number"))
+    monkeypatch.setattr(camera_profiles, "rs", fake_rs)
+    monkeypatch.setattr(camera_profiles, "supported_modes", lambda device, stream_name: device.modes[stream_name])
+    return devices
+
+def test_profile_is_checked_against_the_camera_with_the_serial(cameras):
+    assert resolve_stream_profile("848x480@60", serial="222") == "848x480@60"
+    assert resolve_stream_profile("848x480@60", serial="111") == DEFAULT_STREAM_PROFILE
+
+def test_first_camera_without_serial(cameras):
+    assert resolve_stream_profile("848x480@30") == "848x480@30"
+    assert resolve_stream_profile("848x480@60") == DEFAULT_STREAM_PROFILE
+
+def test_unknown_serial_is_left_to_the_pipeline(cameras):
+    assert resolve_stream_profile("848x480@60", serial="999") == "848x480@60"
+
+def test_unknown_profile_is_rejected(cameras):
+    with pytest.raises(ValueError):
+        resolve_stream_profile("1x1@1")
@@ -0,0 +1,20 @@
+import pytest
+from lib.detector import Detector
+
+def test_failed_load_is_recorded_and_raised(monkeypatch):
+    detector = Detector()
+    def fail(warmup_shape, on_event):
+        raise OSError("weights not found")
+    monkeypatch.setattr(detector, "_load", fail)
+    with pytest.raises(OSError):
+        detector.load()
+    assert detector.error == "OSError: weights not found"
+    assert not detector.ready.is_set()
+
+def test_successful_load_clears_previous_error(monkeypatch):
+    detector = Detector()
+    detector.error = "OSError: weights not found"
+    monkeypatch.setattr(detector, "_load", lambda warmup_shape, on_event: detector.ready.set())
+    detector.load()
+    assert detector.error is None
+    assert detector.ready.is_set()
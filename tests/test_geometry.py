@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+rs = pytest.importorskip("pyrealsense2")
+from lib.geometry import (deproject_pixels, sdk_deprojection_error, camera_to_unity, unity_to_camera, roi_median_depths,
+                          fit_plane, refine_plane, intersect_plane)
+
+def make_intrinsics(model=None, coeffs=(0.0, 0.0, 0.0, 0.0, 0.0), width=640, height=480):
+    intrinsics = rs.intrinsics()
+    intrinsics.width, intrinsics.height = width, height
+    intrinsics.ppx, intrinsics.ppy = 321.5, 238.25
+    intrinsics.fx, intrinsics.fy = 615.0, 612.5
+    intrinsics.model = rs.distortion.none if model is None else model
+    intrinsics.coeffs = list(coeffs)
+    return intrinsics
+
+@pytest.mark.parametrize("model, coeffs", [
+    ("none", (0.0, 0.0, 0.0, 0.0, 0.0)),
+    ("brown_conrady", (0.1, -0.05, 0.001, -0.002, 0.01)),
+    ("inverse_brown_conrady", (0.1, -0.05, 0.001, -0.002, 0.01)),
+    ("kannala_brandt4", (0.02, -0.01, 0.003, -0.001, 0.0)),
+    ("ftheta", (0.9, 0.0, 0.0, 0.0, 0.0)),
+])
+def test_deprojection_matches_sdk(model, coeffs):
+    intrinsics = make_intrinsics(getattr(rs.distortion, model), coeffs)
+    assert sdk_deprojection_error(intrinsics, samples=64) < 1e-5     # The SDK computes in float32
+
+def test_zero_brown_conrady_coefficients_are_pinhole():
+    pixels = np.array([[0.0, 0.0], [639.0, 479.0], [100.0, 400.0]])
+    depths = np.array([1.0, 2.0, 3.5])
+    pinhole = deproject_pixels(make_intrinsics(), pixels, depths)
+    zeros = deproject_pixels(make_intrinsics(rs.distortion.brown_conrady), pixels, depths)
+    np.testing.assert_array_equal(zeros, pinhole)
+
+def test_principal_point_deprojects_onto_optical_axis():
+    intrinsics = make_intrinsics()
+    points = deproject_pixels(intrinsics, [[intrinsics.ppx, intrinsics.ppy]], [2.5])
+    np.testing.assert_allclose(points, [[0.0, 0.0, 2.5]])
+
+def test_pinhole_deprojection_scales_with_depth():
+    intrinsics = make_intrinsics()
+    points = deproject_pixels(intrinsics, [[intrinsics.ppx + 615.0, intrinsics.ppy - 612.5]] * 2, [1.0, 3.0])
+    np.testing.assert_allclose(points, [[1.0, -1.0, 1.0], [3.0, -3.0, 3.0]])
+
+def test_modified_brown_conrady_is_rejected():
+    with pytest.raises(ValueError):
+        deproject_pixels(make_intrinsics(rs.distortion.modified_brown_conrady), [[10, 10]], [1.0])
+
+def test_camera_to_unity_applies_scale_rotation_translation():
+    rotation = np.array([[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])   # 90 degrees about z
+    points = camera_to_unity([[1.0, 0.0, 2.0]], 2.0, rotation, np.array([0.5, 0.0, -1.0]))
+    np.testing.assert_allclose(points, [[0.5, 2.0, 3.0]])
+
+def test_unity_to_camera_inverts_camera_to_unity():
+    rotation = np.array([[0.0, 0.0, 1.0], [0.0, -1.0, 0.0], [1.0, 0.0, 0.0]])
+    translation = np.array([[1.0], [2.0], [3.0]])                # Saved calibrations hold a column vector
+    points = np.array([[0.5, 1.0, 3.0], [-1.0, 1.2, 4.5]])
+    unity = camera_to_unity(points, 1.5, rotation, translation.reshape(-1))
+    np.testing.assert_allclose(unity_to_camera(unity, 1.5, rotation, translation), points)
+
+def test_roi_median_ignores_invalid_and_outside_pixels():
+    depth = np.zeros((5, 5), dtype=np.uint16)
+    depth[0:2, 0:2] = [[1000, 3000], [2000, 0]]                 # 0 is a hole
+    depth[4, 4] = 9000                                          # beyond max_depth
+    depths = roi_median_depths(depth, [[0, 0], [4, 4], [1, 1]], 1, 0.3, 5.0, depth_scale=0.001)
+    np.testing.assert_allclose(depths[0], 2.0)                  # median of 1, 2 and 3 m, the ROI is clipped at the corner
+    assert np.isnan(depths[1])                                  # only 9 m and holes around (4, 4)
+    np.testing.assert_allclose(depths[2], 2.0)                  # the center pixel itself is a hole
+
+def floor_points(count, rng, noise=0.0):
+    """Points on the plane y = 1.2 (a floor 1.2 m below a level camera), 1 to 6 m ahead."""
+    points = np.column_stack((rng.uniform(-2, 2, count), np.full(count, 1.2), rng.uniform(1, 6, count)))
+    points[:, 1] += rng.normal(0, noise, count) if noise else 0.0
+    return points
+
+def test_fit_plane_recovers_plane_facing_the_camera():
+    plane = fit_plane(floor_points(50, np.random.default_rng(1)))
+    np.testing.assert_allclose(plane, [0.0, -1.0, 0.0, 1.2], atol=1e-9)     # camera origin on the positive side
+
+def test_fit_plane_orientation_does_not_depend_on_point_order():
+    points = floor_points(20, np.random.default_rng(2))
+    np.testing.assert_allclose(fit_plane(points[::-1]), fit_plane(points), atol=1e-9)
+
+def test_refine_plane_drops_outliers():
+    rng = np.random.default_rng(3)
+    floor = floor_points(200, rng, noise=0.005)
+    person = np.column_stack((rng.uniform(-0.2, 0.2, 50), rng.uniform(-0.5, 1.1, 50), rng.uniform(2.9, 3.1, 50)))
+    points = np.vstack((floor, person))
+    rough = fit_plane(floor_points(3, rng) + [0.0, 0.02, 0.0])             # e.g. from the calibration markers
+    plane, inliers = refine_plane(rough, points, threshold=0.05)
+    np.testing.assert_allclose(plane, [0.0, -1.0, 0.0, 1.2], atol=5e-3)
+    assert not inliers[200:].any()
+    assert inliers[:200].mean() > 0.99
+
+def test_intersect_plane_hits_floor_at_the_given_height():
+    intrinsics = make_intrinsics()
+    plane = np.array([0.0, -1.0, 0.0, 1.2])
+    floor = np.array([[0.5, 1.2, 3.0], [-1.0, 1.2, 4.0]])
+    pixels = np.column_stack((intrinsics.fx * floor[:, 0] / floor[:, 2] + intrinsics.ppx,
+                              intrinsics.fy * floor[:, 1] / floor[:, 2] + intrinsics.ppy))
+    np.testing.assert_allclose(intersect_plane(intrinsics, pixels, plane), floor)
+    raised = intersect_plane(intrinsics, pixels, plane, heights=np.array([0.2, 0.0]))
+    np.testing.assert_allclose(raised[:, 1], [1.0, 1.2])                    # 0.2 m above the floor, towards the camera
+
+def test_intersect_plane_misses_above_the_horizon():
+    intrinsics = make_intrinsics()
+    plane = np.array([0.0, -1.0, 0.0, 1.2])
+    points = intersect_plane(intrinsics, [[intrinsics.ppx, 0.0], [intrinsics.ppx, intrinsics.ppy]], plane)
+    assert np.isnan(points).all()                                           # pointing up, and parallel to the floor
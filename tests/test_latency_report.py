@@ -0,0 +1,14 @@
+from tools.latency_report import find_dropped_frames
+
+def test_gaps_in_one_run():
+    assert find_dropped_frames([1, 2, 5, 6, 8]) == ([(3, 4), (7, 7)], 1)
+
+def test_counter_restart_starts_a_new_segment():
+    # Second run restarts at 1: neither the restart nor the overlap with the first run are gaps
+    gaps, segments = find_dropped_frames([10, 11, 13, 1, 2, 4, 5])
+    assert gaps == [(12, 12), (3, 3)]
+    assert segments == 2
+
+def test_frames_without_number_are_ignored():
+    assert find_dropped_frames([-1, 3, -1, 4]) == ([], 1)
+    assert find_dropped_frames([]) == ([], 0)
@@ -0,0 +1,32 @@
+import json
+import socket
+import pytest
+from lib.latency import FrameTrace
+from lib.network import Network
+
+@pytest.fixture
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(2.0)
+    yield sock
+    sock.close()
+
+def receive(receiver, envelope, tracking_data, trace=None):
+    network = Network(udp_port=receiver.getsockname()[1], envelope=envelope)
+    network.send_tracking_data(tracking_data, trace)
+    network.close()
+    return json.loads(receiver.recvfrom(65536)[0])
+
+def test_default_is_the_bare_track_list(receiver):
+    tracks = [{'id': 1, 'position': [0.0, 0.0, 2.0], 'bbox': [1, 2, 3, 4]}]
+    network = Network()
+    assert not network.envelope
+    network.close()
+    assert receive(receiver, False, tracks, FrameTrace(5, 10.0, host_clock=False)) == tracks
+    assert receive(receiver, False, []) == []
+
+def test_envelope_carries_frame_and_capture_ts(receiver):
+    assert receive(receiver, True, [], FrameTrace(5, 10.0, host_clock=False)) == \
+        {'frame': 5, 'capture_ts': 10.0, 'tracks': []}
+    assert receive(receiver, True, []) == {'frame': -1, 'capture_ts': None, 'tracks': []}
@@ -0,0 +1,90 @@
+import time
+from lib.profiling import profiler
+from lib.scheduler import TrackingLoop, RefreshLimiter
+
+class FakeTracker:
+    """Produces numbered outputs; raises the queued errors first."""
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.frames = 0
+        self.trace = None
+
+    def idle_delay(self):
+        return 0.0
+
+    def process_frame(self, with_images=False):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.frames += 1
+        time.sleep(0.001)
+        return [{'id': self.frames}], None, None, 0
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+def make_loop(tracker):
+    published = []
+    loop = TrackingLoop(tracker, lambda tracking_data, trace: published.append(tracking_data))
+    loop.retry_delay = 0.01
+    loop.start()
+    return loop, published
+
+def test_unexpected_errors_do_not_end_tracking(capsys):
+    tracker = FakeTracker([ValueError("bug"), ValueError("bug"), RuntimeError("camera unplugged")])
+    loop, published = make_loop(tracker)
+    loop.set_active(True)
+    wait_for(lambda: len(published) >= 3)
+    loop.stop()
+    assert loop.latest[1] is not None
+    err = capsys.readouterr()
+    assert err.out.count("Tracking: frame failed: ValueError('bug')") == 2
+    assert "Tracking: camera unplugged" in err.out
+    assert err.err.count("Traceback") == 1     # Once per run of failures
+
+def test_pause_stops_processing():
+    tracker = FakeTracker()
+    loop, published = make_loop(tracker)
+    loop.set_active(True)
+    wait_for(lambda: tracker.frames >= 2)
+    loop.set_active(False)
+    frames = tracker.frames
+    time.sleep(0.02)
+    assert tracker.frames == frames
+    loop.stop()
+
+def test_pause_ends_cprofile_of_the_tracking_thread(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)                 # The .prof file goes to the working directory
+    tracker = FakeTracker()
+    loop, _ = make_loop(tracker)
+    loop.cprofile_frames = 1000000
+    loop.set_active(True)
+    wait_for(lambda: profiler.cprofile_thread() is not None)
+    loop.set_active(False)
+    assert profiler.cprofile_thread() is None
+    assert list(tmp_path.glob("profile_*.prof"))
+    loop.stop()
+
+def test_refresh_limiter_draws_only_changes():
+    refresh = RefreshLimiter(max_fps=1000)
+    assert refresh.should_draw(("live", 1))
+    assert not refresh.should_draw(("live", 1))
+    time.sleep(0.002)
+    assert not refresh.should_draw(("live", 1))
+    assert refresh.should_draw(("live", 2))
+
+def test_refresh_limiter_caps_the_rate():
+    refresh = RefreshLimiter(max_fps=10)
+    assert refresh.should_draw(1)
+    assert not refresh.should_draw(2)           # Changed, but within the 100 ms slot
+    delay = refresh.delay(streaming=True)
+    assert 50 <= delay <= 100
+    time.sleep(delay / 1000)
+    assert refresh.should_draw(2)
+
+def test_refresh_limiter_idle_poll():
+    refresh = RefreshLimiter(max_fps=30, idle_poll=0.05)
+    assert refresh.delay(streaming=False) == 50
+    assert refresh.delay(streaming=True) >= 1
@@ -0,0 +1,85 @@
+import pytest
+from lib.latency import FrameTrace
+from lib.shared_memory_network import SharedMemoryNetwork, SharedMemoryReader, HEADER_SIZE, SEQLOCK
+
+def track(track_id, position=(1.0, 0.0, 2.5)):
+    return {'id': track_id, 'position': list(position) if position is not None else None, 'bbox': [10, 20, 110, 220]}
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "tracking.mmap")
+
+def test_update_round_trip(path):
+    network = SharedMemoryNetwork(path, max_tracks=2, slot_count=4)
+    reader = SharedMemoryReader(path)
+    assert reader.read_latest() is None
+    network.send_tracking_data([track(1), track(2, None), track(3)], FrameTrace(42, 1234.5, host_clock=False))
+    update = reader.read_latest()
+    assert update['sequence'] == 1 and update['frame'] == 42 and update['capture_ts'] == 1234.5
+    assert [t['id'] for t in update['tracks']] == [1, 2]            # Tracks beyond max_tracks are dropped
+    assert update['tracks'][0]['position'] == [1.0, 0.0, 2.5]
+    assert update['tracks'][0]['bbox'] == [10, 20, 110, 220]
+    assert update['tracks'][1]['position'] is None
+    reader.close()
+    network.close()
+
+def test_empty_update_without_trace(path):
+    network = SharedMemoryNetwork(path)
+    reader = SharedMemoryReader(path)
+    network.send_tracking_data([])
+    assert reader.read_latest() == {'sequence': 1, 'frame': -1, 'capture_ts': 0.0, 'tracks': []}
+    reader.close()
+    network.close()
+
+def test_overwritten_slot_reads_none(path):
+    network = SharedMemoryNetwork(path, slot_count=4)
+    reader = SharedMemoryReader(path)
+    for _ in range(5):
+        network.send_tracking_data([track(1)])
+    assert reader.read(1) is None                                   # Slot 1 now holds sequence 5
+    assert reader.read(5)['sequence'] == 5
+    assert reader.read(2)['sequence'] == 2
+    reader.close()
+    network.close()
+
+def test_slot_being_written_is_not_returned(path):
+    network = SharedMemoryNetwork(path, slot_count=4)
+    reader = SharedMemoryReader(path)
+    network.send_tracking_data([track(1)])
+    offset = HEADER_SIZE + 1 * network.slot_size
+    SEQLOCK.pack_into(network.mm, offset, 3)                        # Odd: writer in the middle of the slot
+    assert reader.read(1, retries=3) is None
+    SEQLOCK.pack_into(network.mm, offset, 4)
+    assert reader.read(1)['sequence'] == 1
+    reader.close()
+    network.close()
+
+def test_restart_keeps_file_and_bumps_generation(path):
+    network = SharedMemoryNetwork(path, slot_count=4)
+    reader = SharedMemoryReader(path)
+    network.send_tracking_data([track(1)])
+    network.send_tracking_data([track(2)])
+    network.close()
+    assert not reader.restarted()
+
+    restarted = SharedMemoryNetwork(path, slot_count=4)
+    assert restarted.generation == network.generation + 1
+    assert reader.restarted()
+    assert not reader.restarted()                                   # Reported once
+    assert reader.latest_sequence() == 0
+    assert reader.read(2) is None                                   # Slots of the previous run are cleared
+    restarted.send_tracking_data([track(7)])
+    assert reader.read_latest()['tracks'][0]['id'] == 7
+    reader.close()
+    restarted.close()
+
+def test_restart_with_other_layout_remaps_reader(path):
+    SharedMemoryNetwork(path, max_tracks=2, slot_count=4).close()
+    reader = SharedMemoryReader(path)
+    network = SharedMemoryNetwork(path, max_tracks=3, slot_count=8)
+    assert reader.restarted()
+    assert (reader.max_tracks, reader.slot_count) == (3, 8)
+    network.send_tracking_data([track(1), track(2), track(3)])
+    assert len(reader.read_latest()['tracks']) == 3
+    reader.close()
+    network.close()
@@ -0,0 +1,22 @@
+import numpy as np
+from lib.skeleton import KEYPOINT_NAMES, pack_skeleton, unpack_skeleton
+
+def test_round_trip_within_float16_precision():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-8.0, 8.0, (17, 3))
+    confidences = rng.uniform(0.0, 1.0, 17)
+    skeleton = unpack_skeleton(pack_skeleton(points, confidences))
+    assert skeleton.shape == (len(KEYPOINT_NAMES), 4) and skeleton.dtype == np.float32
+    np.testing.assert_allclose(skeleton[:, :3], points, atol=4e-3)     # ~4 mm steps below 8 m
+    np.testing.assert_allclose(skeleton[:, 3], confidences, atol=5e-4)
+
+def test_missing_keypoints_stay_nan():
+    points = np.zeros((17, 3))
+    points[[0, 16]] = np.nan
+    skeleton = unpack_skeleton(pack_skeleton(points, np.ones(17)))
+    assert np.isnan(skeleton[[0, 16], :3]).all()
+    assert not np.isnan(skeleton[1:16]).any()
+
+def test_encoded_size():
+    encoded = pack_skeleton(np.zeros((17, 3)), np.zeros(17))
+    assert len(encoded) == 184                                          # base64 of 17 x 4 x 2 bytes
@@ -0,0 +1,43 @@
+import json
+import socket
+import time
+import pytest
+from lib.latency import FrameTrace
+from lib.stream_server import StreamServer
+
+@pytest.fixture
+def server():
+    server = StreamServer(port=0, poll_interval=0.001)
+    server.start()
+    yield server
+    server.close()
+
+def connect(server, subscription):
+    port = server._server.sockets[0].getsockname()[1]
+    client = socket.create_connection(("127.0.0.1", port), timeout=2)
+    client.sendall((json.dumps(subscription) + "\n").encode("utf-8"))
+    return client, client.makefile("rb")
+
+def test_start_raises_when_the_port_is_taken(server):
+    port = server._server.sockets[0].getsockname()[1]
+    second = StreamServer(port=port)
+    with pytest.raises(OSError):
+        second.start()
+    assert second._thread is None and second.loop is None
+    second.close()                                  # Nothing to close, must not hang
+
+def test_nothing_is_picked_up_without_subscribers(server):
+    server.send_tracking_data([{'id': 1, 'position': [0.0, 0.0, 1.0]}])
+    time.sleep(0.02)
+    assert server.sequence == 0
+
+def test_new_subscriber_gets_the_current_state(server):
+    server.send_tracking_data([{'id': 1, 'position': [0.0, 0.0, 1.0], 'bbox': [1, 2, 3, 4]}],
+                              FrameTrace(9, 100.0, host_clock=False))
+    client, lines = connect(server, {"fields": ["id"]})
+    assert json.loads(lines.readline()) == {"subscribed": {"fields": ["id"], "rate": 0.0}}
+    assert json.loads(lines.readline()) == {"sequence": 1, "frame": 9, "capture_ts": 100.0, "tracks": [{"id": 1}]}
+
+    server.send_tracking_data([])
+    assert json.loads(lines.readline()) == {"sequence": 2, "frame": -1, "capture_ts": None, "tracks": []}
+    client.close()
@@ -0,0 +1,74 @@
+import numpy as np
+from lib.track_table import TrackTable
+
+def ids(*values):
+    return np.array(values, dtype=np.int64)
+
+def test_new_tracks_fill_free_slots_in_detection_order():
+    table = TrackTable(3)
+    slots = table.update(ids(7, 8))
+    assert slots.tolist() == [0, 1]
+    assert table.ids.tolist() == [7, 8, TrackTable.FREE]
+    assert table.detection.tolist() == [0, 1, -1]
+    assert table.count() == 2
+
+def test_known_track_keeps_its_slot_when_detection_order_changes():
+    table = TrackTable(3)
+    table.update(ids(7, 8))
+    slots = table.update(ids(8, 7))
+    assert slots.tolist() == [0, 1]
+    assert table.detection.tolist() == [1, 0, -1]
+
+def test_admission_scores_pick_new_tracks_when_full():
+    table = TrackTable(2)
+    table.update(ids(1, 2, 3), admission_scores=np.array([5.0, 1.0, 3.0]))
+    assert sorted(table.ids.tolist()) == [2, 3]
+
+def test_without_scores_first_detections_are_admitted():
+    table = TrackTable(2)
+    table.update(ids(1, 2, 3))
+    assert table.ids.tolist() == [1, 2]
+
+def test_missed_track_survives_grace_period_then_is_evicted():
+    table = TrackTable(2, grace_frames=2)
+    table.update(ids(5))
+    table.smooth_depth(np.array([0]), np.array([2.0]), 0.5)
+    for _ in range(2):
+        assert table.update(ids()).size == 0
+        assert table.ids[0] == 5
+    assert table.depth[0] == 2.0                # Smoothing state survives the occlusion
+    table.update(ids())
+    assert table.ids[0] == TrackTable.FREE
+    assert np.isnan(table.depth[0])
+    assert table.missed[0] == 0
+
+def test_redetection_resets_missed_count():
+    table = TrackTable(1, grace_frames=2)
+    table.update(ids(5))
+    table.update(ids())
+    table.update(ids(5))
+    assert table.missed[0] == 0
+    table.update(ids())
+    table.update(ids())
+    assert table.ids[0] == 5
+
+def test_smooth_depth_starts_with_first_sample():
+    table = TrackTable(2)
+    table.update(ids(1, 2))
+    slots = np.array([0, 1])
+    assert table.smooth_depth(slots, np.array([2.0, 4.0]), 0.25).tolist() == [2.0, 4.0]
+    assert table.smooth_depth(slots, np.array([4.0, 0.0]), 0.25).tolist() == [2.5, 3.0]
+
+def test_more_detections_than_buffer_width():
+    table = TrackTable(3)
+    slots = table.update(np.arange(20, dtype=np.int64))
+    assert slots.tolist() == [0, 1, 2]
+    assert table.update(np.arange(20, dtype=np.int64)[::-1]).tolist() == [0, 1, 2]
+    assert table.detection.tolist() == [19, 18, 17]
+
+def test_reset_frees_every_slot():
+    table = TrackTable(2)
+    table.update(ids(1, 2))
+    table.reset()
+    assert table.count() == 0
+    assert table.update(ids(3)).tolist() == [0]
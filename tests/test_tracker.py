@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+rs = pytest.importorskip("pyrealsense2")
+from lib.tracker import Tracker
+from lib.track_table import TrackTable
+
+def bare_tracker():
+    """Tracker with just the state the tested methods use (no camera, no model)."""
+    tracker = Tracker.__new__(Tracker)
+    tracker.max_tracks = 3
+    tracker.track_grace_frames = 15
+    tracker.tracks = TrackTable(3, 15)
+    intrinsics = rs.intrinsics()
+    intrinsics.width, intrinsics.height = 640, 480
+    intrinsics.ppx, intrinsics.ppy, intrinsics.fx, intrinsics.fy = 320.0, 240.0, 600.0, 600.0
+    intrinsics.model = rs.distortion.none
+    intrinsics.coeffs = [0.0] * 5
+    tracker.intrinsics = intrinsics
+    tracker.scale = 1.0
+    tracker.rotation_matrix = np.eye(3)
+    tracker.translation_vector = np.array([0.0, 0.0, -4.0])     # Unity origin 4 m in front of the camera
+    tracker.play_area_center = None
+    tracker.play_area_pixel = None
+    tracker.track_admission = "center"
+    return tracker
+
+def test_configure_tracks_rebuilds_the_table():
+    tracker = bare_tracker()
+    tracker.tracks.update(np.array([1, 2], dtype=np.int64))
+    tracker.configure_tracks(max_tracks=5, grace_frames=3)
+    assert (tracker.max_tracks, tracker.track_grace_frames) == (5, 3)
+    assert tracker.tracks.ids.size == 5 and tracker.tracks.count() == 0
+    assert tracker.tracks.grace_frames == 3
+
+def test_play_area_center_is_projected_through_the_calibration():
+    tracker = bare_tracker()
+    tracker.play_area_center = (0.6, 0.0, 2.0)                  # Camera frame (0.6, 0, 6)
+    tracker._locate_play_area()
+    np.testing.assert_allclose(tracker.play_area_pixel, (380.0, 240.0))
+    scores = tracker._admission_scores(np.array([[370.0, 100, 390, 240], [0, 100, 20, 240]]), 640, 480)
+    assert scores[0] < scores[1]
+
+def test_play_area_behind_the_camera_falls_back_to_the_image_center():
+    tracker = bare_tracker()
+    tracker.play_area_center = (0.0, 0.0, -10.0)
+    tracker._locate_play_area()
+    assert tracker.play_area_pixel is None
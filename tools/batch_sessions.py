@@ -0,0 +1,228 @@
+"""
+Re-run recorded sessions offline across a process pool, with parameter sweeps.
+
+Every .bag file is played back as fast as the pipeline runs (not at capture rate), with
+batched inference. A sweep lists values for tuning parameters of the Tracker; every
+combination is evaluated. YOLO results and association do not depend on these parameters,
+so a shard runs inference once per frame and feeds the result to one copy of the tracking
+state per parameter combination. Shards (a recording and a share of the combinations) run
+in separate processes; with fewer recordings than workers the combinations are split
+further so every core has work, and then every shard of a recording runs inference on it
+again. On CUDA the workers share one GPU, so they are capped (--cuda-workers) and the
+combinations are split less.
+
+For every recording and combination a columnar .npz file is written, one row per track and
+frame: frame, capture_ts, id, position (x, y, z in Unity, NaN without a position) and bbox,
+plus the params as JSON. A summary per run is printed (depth-miss rate and the identity
+estimates of tools/bench_association.py).
+
+Usage (from the repository root):
+    python -m tools.batch_sessions recordings/ --sweep person_confidence=0.5,0.6,0.7 roi_size=3,5,8 --out results
+"""
+import argparse
+import copy
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from tools.bench_association import IdentityStats
+
+# Tracker attributes a sweep may set (roi_size and min_bbox_size are pixels of the recording)
+SWEEP_PARAMETERS = {"person_confidence": float, "feet_confidence": float, "roi_size": int, "depth_alpha": float,
+                    "min_bbox_size": int, "track_grace_frames": int, "ankle_height": float}
+
+def parse_sweep(specs):
+    """
+    Turn ["name=v1,v2", ...] into the list of all parameter combinations.
+
+    Returns:
+    - param_sets: list of {name: value} dicts, [{}] for no sweep
+    """
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in SWEEP_PARAMETERS or not values:
+            raise SystemExit(f"Bad sweep {spec!r}, expected name=v1,v2 with name one of {', '.join(SWEEP_PARAMETERS)}")
+        axes.append([(name, SWEEP_PARAMETERS[name](value)) for value in values.split(",")])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+def find_sessions(paths):
+    """Expand directories to the .bag files they contain."""
+    sessions = []
+    for path in paths:
+        if os.path.isdir(path):
+            sessions += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".bag"))
+        else:
+            sessions.append(path)
+    return sessions
+
+def plan_shards(sessions, param_sets, workers):
+    """Split every recording's combinations into chunks so there are about as many shards as workers."""
+    chunks = max(1, min(len(param_sets), workers // max(len(sessions), 1)))
+    size = math.ceil(len(param_sets) / chunks)
+    return [(session, param_sets[i:i + size]) for session in sessions for i in range(0, len(param_sets), size)]
+
+def output_name(session, params):
+    """File name of one run, e.g. night1__person_confidence=0.6_roi_size=5.npz"""
+    tag = "_".join(f"{name}={value}" for name, value in params.items()) or "default"
+    return f"{os.path.splitext(os.path.basename(session))[0]}__{tag}.npz"
+
+class RunRecorder:
+    """Tracking state for one parameter combination plus the columns of its results."""
+    def __init__(self, tracker, params):
+        self.params = params
+        self.tracker = copy.copy(tracker)       # Shares camera, detector and calibration, own parameters and state
+        for name, value in params.items():
+            setattr(self.tracker, name, value)
+        self.tracker.configure_tracks()         # Own track table, sized by the (swept) parameters
+        self.tracker.associator = None          # Created on the first frame, bound to this copy
+        self.tracker.depth_filters = None       # Depth is filtered once per frame by the shared tracker (grab_batch)
+        self.tracker.activity_gate = None       # Every recorded frame is tracked, the gate is never consulted
+        self.tracker.trace = None
+        self.tracker.depth_samples = self.tracker.depth_misses = 0
+        self.stats = IdentityStats(tracker._frame_rate())
+        self.rows = []                          # (frame, capture_ts, id, x, y, z, x_min, y_min, x_max, y_max)
+
+    def add(self, capture, result):
+        capture = capture._replace(trace=capture.trace.copy())  # track() stamps its stages on this run's own trace
+        tracking_data, _, _, _ = self.tracker.track(capture, result)
+        self.stats.add(tracking_data)
+        trace = capture.trace
+        for track in tracking_data:
+            position = track['position'] or (np.nan, np.nan, np.nan)
+            self.rows.append((trace.frame_number, trace.capture_timestamp, track['id'], *position, *track['bbox']))
+
+    def save(self, filename):
+        rows = np.array(self.rows, dtype=np.float64).reshape(-1, 10)
+        np.savez(filename,
+                 frame=rows[:, 0].astype(np.int64),
+                 capture_ts=rows[:, 1],
+                 id=rows[:, 2].astype(np.int64),
+                 position=rows[:, 3:6].astype(np.float32),
+                 bbox=rows[:, 6:10].astype(np.int32),
+                 params=np.array(json.dumps(self.params)))
+
+    def summary(self):
+        samples = self.tracker.depth_samples
+        return {"params": self.params, "rows": len(self.rows), "ids": len(self.stats.ids),
+                "fragments": self.stats.fragments, "jumps": self.stats.jumps,
+                "depth_miss": self.tracker.depth_misses / samples if samples else 0.0}
+
+def uses_cuda(force_cpu):
+    """True if the workers' Detector will run on CUDA (same check as Detector.load)."""
+    if force_cpu:
+        return False
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+def init_worker(threads):
+    """Limit torch's intra-op threads so the workers do not oversubscribe the cores."""
+    import torch
+    torch.set_num_threads(threads)
+
+def process_shard(session, param_sets, out_dir, options):
+    """
+    Play one recording and track it with every parameter combination of the shard.
+
+    Returns:
+    - frames: int, number of frames processed
+    - elapsed: float, wall time (s)
+    - summaries: list of RunRecorder.summary dicts
+    """
+    from lib.tracker import Tracker
+
+    start = time.perf_counter()
+    tracker = Tracker(bag_file=session, force_cpu=options["force_cpu"], depth_filters=options["depth_filters"],
+                      position_mode=options["position_mode"], tracker_backend=options["tracker_backend"])
+    tracker.load_model()
+    tracker.quiet = True                        # Depth misses are in the summary, not one line per miss
+    runs = [RunRecorder(tracker, params) for params in param_sets]
+    with_depth = any(run.tracker.needs_depth() for run in runs)
+    frames = 0
+    try:
+        while options["max_frames"] is None or frames < options["max_frames"]:
+            try:
+                captures = tracker.grab_batch(options["batch_size"], with_depth)
+            except RuntimeError:
+                break  # Playback reached the end of the recording
+            results = tracker.detector.predict([capture.color_image for capture in captures])
+            for capture, result in zip(captures, results):
+                capture.trace.stamp("inference")
+                for run in runs:
+                    run.add(capture, result)
+            frames += len(captures)
+    finally:
+        tracker.stop()
+    for run in runs:
+        run.save(os.path.join(out_dir, output_name(session, run.params)))
+    return frames, time.perf_counter() - start, [run.summary() for run in runs]
+
+def main():
+    parser = argparse.ArgumentParser(description="Track recorded sessions offline in parallel, with parameter sweeps.")
+    parser.add_argument("sessions", nargs="+", help=".bag files or directories of .bag files")
+    parser.add_argument("--sweep", nargs="*", default=[], metavar="NAME=V1,V2",
+                        help=f"parameter values to combine, names: {', '.join(SWEEP_PARAMETERS)}")
+    parser.add_argument("--out", default="batch_results", help="directory for the .npz files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--cuda-workers", type=int, default=1,
+                        help="worker processes when the model runs on CUDA (each one holds a model on the GPU)")
+    parser.add_argument("--threads", type=int, default=None, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--batch-size", type=int, default=4, help="frames per forward pass")
+    parser.add_argument("--max-frames", type=int, default=None, help="stop each recording after this many frames")
+    parser.add_argument("--depth-filters", default="none")
+    parser.add_argument("--position-mode", default="depth", choices=["depth", "floor"])
+    parser.add_argument("--tracker-backend", default="botsort")
+    parser.add_argument("--force-cpu", action="store_true")
+    args = parser.parse_args()
+
+    sessions = find_sessions(args.sessions)
+    if not sessions:
+        raise SystemExit("No .bag files found")
+    param_sets = parse_sweep(args.sweep)
+    workers = args.workers
+    if uses_cuda(args.force_cpu) and workers > args.cuda_workers:
+        print(f"Model runs on CUDA: {args.cuda_workers} workers instead of {workers}")
+        workers = args.cuda_workers
+    shards = plan_shards(sessions, param_sets, workers)
+    workers = min(workers, len(shards))
+    threads = args.threads or max(1, os.cpu_count() // workers)
+    os.makedirs(args.out, exist_ok=True)
+    options = {"force_cpu": args.force_cpu, "depth_filters": args.depth_filters, "position_mode": args.position_mode,
+               "tracker_backend": args.tracker_backend, "batch_size": args.batch_size, "max_frames": args.max_frames}
+    print(f"{len(sessions)} sessions x {len(param_sets)} parameter sets in {len(shards)} shards, "
+          f"{workers} workers x {threads} threads")
+
+    start = time.perf_counter()
+    total_frames = 0
+    rows = []
+    # spawn: the RealSense SDK and torch do not survive a fork
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker, initargs=(threads,)) as pool:
+        futures = {pool.submit(process_shard, session, chunk, args.out, options): session for session, chunk in shards}
+        for future in as_completed(futures):
+            session = futures[future]
+            try:
+                frames, elapsed, summaries = future.result()
+            except Exception as e:
+                print(f"{session}: failed: {e}")
+                continue
+            total_frames += frames
+            print(f"{session}: {frames} frames x {len(summaries)} parameter sets in {elapsed:.1f}s")
+            rows += [(session, frames, summary) for summary in summaries]
+
+    elapsed = time.perf_counter() - start
+    print(f"\nProcessed {total_frames} frames in {elapsed:.1f}s ({total_frames / elapsed:.1f} frames/s overall)")
+    print(f"{'session':<24}{'frames':>7}{'rows':>8}{'miss %':>8}{'IDs':>5}{'fragments':>10}{'jumps':>6}  params")
+    for session, frames, summary in sorted(rows, key=lambda row: (row[0], json.dumps(row[2]["params"]))):
+        print(f"{os.path.basename(session)[-24:]:<24}{frames:>7}{summary['rows']:>8}{100 * summary['depth_miss']:>8.1f}"
+              f"{summary['ids']:>5}{summary['fragments']:>10}{summary['jumps']:>6}  {json.dumps(summary['params'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare tracker backends (association of detections to track IDs) on recorded RealSense sessions.
+
+Every .bag file is played back once per backend. Without ground truth, identity errors are
+estimated with two proxies on the positions sent to Unity:
+- fragments: a new ID appears close to where another ID was lost shortly before
+  (the same person got a new ID)
+- jumps: an ID moves implausibly far between consecutive frames (two people swapped IDs)
+Fewer IDs, fragments and jumps are better. The per-frame association cost is reported next
+to them.
+
+Usage (from the repository root):
+    python -m tools.bench_association session.bag [more.bag ...] --backends botsort bytetrack floor
+"""
+import argparse
+import numpy as np
+from lib.association import TRACKER_BACKENDS
+
+def stage_duration(trace, stage):
+    """Milliseconds between the given stage stamp and the stamp before it, or None."""
+    names = [name for name, _ in trace.stages]
+    if stage not in names:
+        return None
+    index = names.index(stage)
+    return (trace.stages[index][1] - trace.stages[index - 1][1]) / 1e6
+
+class IdentityStats:
+    """Fragment and jump counts from the tracking data of consecutive frames."""
+    def __init__(self, frame_rate, fragment_distance=0.5, fragment_window=1.0, jump_speed=5.0):
+        self.fragment_distance = fragment_distance              # New ID this close to a lost one is a fragment (m)
+        self.fragment_frames = int(fragment_window * frame_rate)
+        self.jump_distance = jump_speed / frame_rate            # Farther than this in one frame is a jump (m)
+        self.frame = 0
+        self.ids = set()
+        self.last = {}                                          # {id: (frame, position)}
+        self.fragments = 0
+        self.jumps = 0
+
+    def add(self, tracking_data):
+        self.frame += 1
+        current = {track['id']: np.asarray(track['position']) for track in tracking_data if track['position'] is not None}
+        lost = [(position, frame) for track_id, (frame, position) in self.last.items()
+                if track_id not in current and self.frame - frame <= self.fragment_frames]
+        for track_id, position in current.items():
+            if track_id not in self.ids:
+                self.ids.add(track_id)
+                if any(np.linalg.norm(position - lost_position) < self.fragment_distance for lost_position, _ in lost):
+                    self.fragments += 1
+            elif track_id in self.last and self.last[track_id][0] == self.frame - 1:
+                if np.linalg.norm(position - self.last[track_id][1]) > self.jump_distance:
+                    self.jumps += 1
+            self.last[track_id] = (self.frame, position)
+
+def run_session(bag_file, backend, max_frames=None):
+    """
+    Play one recording through the Tracker with the given backend.
+
+    Returns:
+    - frames: int, number of frames processed
+    - association_time: float, mean association cost per frame (ms)
+    - stats: IdentityStats of the run
+    """
+    from lib.tracker import Tracker             # Needs pyrealsense2, IdentityStats alone does not
+
+    tracker = Tracker(bag_file=bag_file, tracker_backend=backend)
+    tracker.load_model()
+    stats = IdentityStats(tracker._frame_rate())
+    durations = []
+    try:
+        while max_frames is None or stats.frame < max_frames:
+            try:
+                tracking_data, _, _, _ = tracker.process_frame()
+            except RuntimeError:
+                break  # Playback reached the end of the recording
+            duration = stage_duration(tracker.trace, "associate")
+            if duration is not None:
+                durations.append(duration)
+            stats.add(tracking_data)
+    finally:
+        tracker.stop()
+    return stats.frame, float(np.mean(durations)) if durations else 0.0, stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tracker backends on .bag recordings.")
+    parser.add_argument("bag_files", nargs="+", help="recorded RealSense sessions (.bag)")
+    parser.add_argument("--backends", nargs="+", default=list(TRACKER_BACKENDS), choices=list(TRACKER_BACKENDS),
+                        help="backends to compare")
+    parser.add_argument("--max-frames", type=int, default=None, help="stop each run after this many frames")
+    args = parser.parse_args()
+
+    print(f"{'session':<30}{'backend':<11}{'frames':>8}{'ms/frame':>10}{'IDs':>6}{'fragments':>11}{'jumps':>7}")
+    for bag_file in args.bag_files:
+        for backend in args.backends:
+            frames, association_time, stats = run_session(bag_file, backend, args.max_frames)
+            print(f"{bag_file[-30:]:<30}{backend:<11}{frames:>8}{association_time:>10.2f}{len(stats.ids):>6}"
+                  f"{stats.fragments:>11}{stats.jumps:>7}")
+
+if __name__ == "__main__":
+    main()
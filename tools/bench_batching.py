@@ -0,0 +1,72 @@
+"""
+Measure YOLO pose throughput against batch size.
+
+Frames are taken from a recorded .bag session when one is given (so the post-processing
+cost matches real scenes), otherwise random images of the stream profile's size are used.
+Each batch is one Detector.predict call, i.e. one forward pass, exactly as
+process_sources (several cameras) and Tracker.process_batch (offline) run it.
+
+Usage (from the repository root):
+    python -m tools.bench_batching --bag session.bag --batch-sizes 1 2 4 8 --iterations 50
+"""
+import argparse
+import time
+import numpy as np
+from lib.detector import Detector
+from lib.tracker import Tracker
+from lib.camera_profiles import STREAM_PROFILES, DEFAULT_STREAM_PROFILE
+
+def load_frames(bag_file, count, profile):
+    """Return count BGR frames from a recording, or random frames of the profile's size."""
+    if bag_file is None:
+        width, height, _ = STREAM_PROFILES[profile]["color"]
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+    tracker = Tracker(bag_file=bag_file)
+    frames = []
+    try:
+        while len(frames) < count:
+            capture = tracker.grab()
+            if capture is not None:
+                frames.append(capture.color_image.copy())   # The SDK reuses the frame memory
+    except RuntimeError:
+        pass  # Recording shorter than requested, reuse what we have
+    finally:
+        tracker.stop()
+    if not frames:
+        raise SystemExit(f"No frames read from {bag_file}")
+    return [frames[i % len(frames)] for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched YOLO inference throughput.")
+    parser.add_argument("--bag", default=None, help="recorded session to take frames from")
+    parser.add_argument("--profile", default=DEFAULT_STREAM_PROFILE, choices=list(STREAM_PROFILES),
+                        help="frame size for random frames")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--iterations", type=int, default=50, help="batches timed per batch size")
+    parser.add_argument("--force-cpu", action="store_true")
+    args = parser.parse_args()
+
+    frames = load_frames(args.bag, max(args.batch_sizes), args.profile)
+    detector = Detector(force_cpu=args.force_cpu)
+    detector.load(frames[0].shape[:2])
+    print(f"Device: {detector.device}, frame size {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    print(f"{'batch':>6}{'ms/batch':>10}{'ms/frame':>10}{'frames/s':>10}{'speedup':>9}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        batch = frames[:batch_size]
+        for _ in range(3):
+            detector.predict(batch)     # Warm up this batch shape
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            detector.predict(batch)
+        batch_time = (time.perf_counter() - start) * 1000 / args.iterations
+        throughput = 1000 * batch_size / batch_time
+        baseline = baseline or throughput
+        print(f"{batch_size:>6}{batch_time:>10.1f}{batch_time / batch_size:>10.1f}{throughput:>10.1f}"
+              f"{throughput / baseline:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare depth post-processing chains on recorded RealSense sessions.
+
+Every .bag file is played back through the Tracker once per chain. For each run the
+fraction of foot ROI samples without a valid depth (the "No valid depths" case) is
+reported next to the per-frame cost of the chain, so the cheapest chain that fixes
+the holes can be picked.
+
+Usage (from the repository root):
+    python -m tools.bench_depth_filters session.bag [more.bag ...] --chains none fill full --decimate 1 2
+"""
+import argparse
+from lib.tracker import Tracker
+from lib.depth_filters import DEPTH_FILTER_PRESETS
+
+def run_session(bag_file, chain, decimate, max_frames=None):
+    """
+    Play one recording through the Tracker with the given chain.
+
+    Returns:
+    - frames: int, number of frames processed
+    - samples: int, number of foot ROI depth samples
+    - misses: int, number of samples without a valid depth
+    - chain_time: float, mean chain cost per frame (ms)
+    - breakdown: str, per-filter EMA timings
+    """
+    tracker = Tracker(depth_filters=chain, depth_decimation=decimate, bag_file=bag_file)
+    tracker.load_model()
+    frames = 0
+    chain_time = 0.0
+    try:
+        while max_frames is None or frames < max_frames:
+            try:
+                tracker.process_frame()
+            except RuntimeError:
+                break  # Playback reached the end of the recording
+            frames += 1
+            chain_time += tracker.depth_filters.last_time
+    finally:
+        tracker.stop()
+    mean_time = chain_time / frames if frames else 0.0
+    return frames, tracker.depth_samples, tracker.depth_misses, mean_time, tracker.depth_filters.describe()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark depth filter chains on .bag recordings.")
+    parser.add_argument("bag_files", nargs="+", help="recorded RealSense sessions (.bag)")
+    parser.add_argument("--chains", nargs="+", default=list(DEPTH_FILTER_PRESETS),
+                        choices=list(DEPTH_FILTER_PRESETS), help="presets to compare")
+    parser.add_argument("--decimate", nargs="+", type=int, default=[1, 2],
+                        help="decimation magnitudes to run each chain at")
+    parser.add_argument("--max-frames", type=int, default=None, help="stop each run after this many frames")
+    args = parser.parse_args()
+
+    rows = []
+    for chain in args.chains:
+        for decimate in args.decimate:
+            totals = [0, 0, 0, 0.0]
+            for bag_file in args.bag_files:
+                frames, samples, misses, mean_time, breakdown = run_session(bag_file, chain, decimate, args.max_frames)
+                print(f"{bag_file} [{chain} x{decimate}] {frames} frames, {breakdown}")
+                totals[0] += frames
+                totals[1] += samples
+                totals[2] += misses
+                totals[3] += mean_time * frames
+            rows.append((chain, decimate, *totals))
+
+    print()
+    print(f"{'chain':<10}{'decimate':>9}{'frames':>9}{'samples':>9}{'miss rate':>11}{'ms/frame':>10}")
+    for chain, decimate, frames, samples, misses, total_time in rows:
+        miss_rate = 100 * misses / samples if samples else 0.0
+        ms_per_frame = total_time / frames if frames else 0.0
+        print(f"{chain:<10}{decimate:>9}{frames:>9}{samples:>9}{miss_rate:>10.1f}%{ms_per_frame:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measure the activity gate: CPU usage while idle and how fast tracking wakes up.
+
+Runs the tracker on the live camera (or a recording) for a while with the gate enabled,
+and optionally once more without it for comparison. Process CPU usage is sampled every
+second and attributed to the idle or active state. For every wake-up the tool reports how
+long it took from the arrival of the frame that showed motion until YOLO results were
+out, and until the first track was sent; on top of that, motion can go unseen for up to
+one poll interval while idle.
+
+Walk onto the floor and off again a few times while it runs.
+
+Usage (from the repository root):
+    python -m tools.bench_idle --duration 120 --compare
+"""
+import argparse
+import time
+import numpy as np
+import psutil
+from lib.tracker import Tracker
+
+def run(duration, idle_gate, bag_file=None):
+    """
+    Run the tracker for duration seconds.
+
+    Returns:
+    - cpu: {"idle": [cpu %], "active": [cpu %]}, one sample per second
+    - wakes: list of (ms until YOLO results, ms until the first track or None)
+    - poll_interval: float or None, the gate's idle poll interval (s)
+    """
+    tracker = Tracker(bag_file=bag_file, idle_gate=idle_gate)
+    tracker.load_model()
+    process = psutil.Process()
+    process.cpu_percent(None)                   # Start the first measurement interval
+    cpu = {"idle": [], "active": []}
+    wakes = []
+    waking = None                               # (index into wakes, arrival ns of the wake frame)
+    was_idle = False
+    next_sample = time.perf_counter() + 1
+    end = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < end:
+            time.sleep(tracker.idle_delay())    # Idle poll rate, process_frame does not wait itself
+            try:
+                tracking_data, _, _, _ = tracker.process_frame()
+            except RuntimeError:
+                break  # Playback reached the end of the recording
+            now = time.perf_counter_ns()
+            gate = tracker.activity_gate
+            idle = gate is not None and gate.idle and tracker.tracks.count() == 0
+            if was_idle and not idle:
+                arrival = tracker.trace.stages[0][1]
+                wakes.append([(now - arrival) / 1e6, None])
+                waking = (len(wakes) - 1, arrival)
+            if waking is not None and tracking_data:
+                wakes[waking[0]][1] = (now - waking[1]) / 1e6
+                waking = None
+            was_idle = idle
+
+            if time.perf_counter() >= next_sample:
+                cpu["idle" if idle else "active"].append(process.cpu_percent(None))
+                next_sample += 1
+    finally:
+        tracker.stop()
+    return cpu, wakes, tracker.activity_gate.poll_interval if tracker.activity_gate else None
+
+def describe(samples):
+    return f"{np.mean(samples):6.1f}% over {len(samples)} s" if samples else "      - (never)"
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure idle CPU usage and wake-up latency of the activity gate.")
+    parser.add_argument("--duration", type=float, default=60, help="seconds per run")
+    parser.add_argument("--bag", default=None, help="recorded session (.bag) instead of the live camera")
+    parser.add_argument("--compare", action="store_true", help="also run without the gate")
+    args = parser.parse_args()
+
+    cpu, wakes, poll_interval = run(args.duration, True, args.bag)
+    print(f"With gate:    idle CPU {describe(cpu['idle'])}, active CPU {describe(cpu['active'])}")
+    if args.compare:
+        ungated, _, _ = run(args.duration, False, args.bag)
+        print(f"Without gate: CPU {describe(ungated['idle'] + ungated['active'])}")
+
+    print(f"{len(wakes)} wake-ups (motion can go unseen for up to {1000 * poll_interval:.0f} ms while idle)")
+    for results_ms, first_track_ms in wakes:
+        first_track = f"{first_track_ms:.0f} ms" if first_track_ms is not None else "no track"
+        print(f"  motion frame -> YOLO results {results_ms:.0f} ms, -> first track {first_track}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Report tracking latency for each camera stream profile.
+
+For every profile the live camera is streamed through the Tracker and, per frame, the
+time from the sensor timestamp to the moment the tracking data is ready to send is
+measured. This is the motion-to-photon latency up to the network send; the Unity
+render and projector latency come on top and are the same for every profile.
+
+Sensor timestamps are only comparable to the host clock in the global or system time
+domain (the D400 default). Profiles reporting the hardware clock domain are skipped.
+See tools/latency_report.py for a per-stage breakdown of a live session.
+
+Usage (from the repository root):
+    python -m tools.bench_profiles --profiles 1280x720@30 848x480@60 --frames 300
+"""
+import argparse
+import time
+import numpy as np
+from lib.tracker import Tracker
+from lib.camera_profiles import STREAM_PROFILES, resolve_stream_profile
+
+def measure_profile(name, frames, warmup):
+    """
+    Stream one profile and collect per-frame latencies.
+
+    Returns:
+    - latencies: numpy array of capture-to-result latencies (ms)
+    - fps: float, achieved processing rate
+    """
+    tracker = Tracker(stream_profile=name)
+    tracker.load_model()
+    latencies = []
+    try:
+        for _ in range(warmup):
+            tracker.process_frame()
+        start = time.perf_counter()
+        for _ in range(frames):
+            tracker.process_frame()
+            latency = tracker.trace.capture_latency()
+            if latency is not None:
+                latencies.append(latency)
+        elapsed = time.perf_counter() - start
+    finally:
+        tracker.stop()
+    return np.array(latencies), frames / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure capture-to-send latency per stream profile.")
+    parser.add_argument("--profiles", nargs="+", default=list(STREAM_PROFILES), choices=list(STREAM_PROFILES))
+    parser.add_argument("--frames", type=int, default=300, help="frames measured per profile")
+    parser.add_argument("--warmup", type=int, default=30, help="frames skipped per profile before measuring")
+    args = parser.parse_args()
+
+    rows = []
+    for name in args.profiles:
+        if resolve_stream_profile(name) != name:
+            rows.append(f"{name:<14}  unsupported by this camera")
+            continue
+        latencies, fps = measure_profile(name, args.frames, args.warmup)
+        if latencies.size == 0:
+            rows.append(f"{name:<14}{fps:>7.1f}  (hardware clock timestamps, latency unavailable)")
+            continue
+        p50, p95 = np.percentile(latencies, [50, 95])
+        rows.append(f"{name:<14}{fps:>7.1f}{p50:>9.1f}{p95:>9.1f}{latencies.max():>9.1f}")
+
+    print()
+    print(f"{'profile':<14}{'fps':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    print("\n".join(rows))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Compare the UDP and shared-memory output channels on this machine.
+
+A sender publishes synthetic tracking updates at a fixed rate while a receiver in a
+separate process (standing in for Unity) picks them up: the UDP receiver blocks on the
+socket and parses the JSON, the shared-memory receiver polls the ring. The send time is
+carried in the update's 'capture_ts', so the receiver can report the one-way delivery
+latency next to the sender's per-update cost. No camera or model is needed.
+
+Usage (from the repository root):
+    python -m tools.bench_transport --updates 2000 --tracks 3 --interval 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+import numpy as np
+from lib.latency import FrameTrace
+from lib.shared_memory_network import SharedMemoryNetwork, SharedMemoryReader
+
+UDP_ADDRESS = ("127.0.0.1", 5006)  # Off the Unity port, so a running Unity project is not fed test data
+
+def now_ms():
+    return time.perf_counter_ns() / 1e6  # Monotonic and shared between processes on the same machine
+
+def make_tracks(count):
+    return [{'id': i + 1, 'position': [0.5 * i, 0.0, 2.0], 'bbox': [100, 100, 200, 400]} for i in range(count)]
+
+def udp_receiver(updates, ready, results):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(UDP_ADDRESS)
+    sock.settimeout(2.0)
+    ready.set()
+    latencies = []
+    try:
+        while len(latencies) < updates:
+            data, _ = sock.recvfrom(65536)
+            update = json.loads(data)
+            latencies.append(now_ms() - update['capture_ts'])
+    except socket.timeout:
+        pass  # Lost datagrams, report what arrived
+    sock.close()
+    results.put(latencies)
+
+def shm_receiver(path, updates, ready, results):
+    reader = SharedMemoryReader(path)
+    ready.set()
+    latencies = []
+    last = 0
+    deadline = time.monotonic() + 2.0
+    while last < updates and time.monotonic() < deadline:
+        sequence = reader.latest_sequence()
+        if sequence == last:
+            continue  # Busy poll, like a Unity Update() loop that checks every frame
+        update = reader.read(sequence)
+        if update is not None:
+            latencies.append(now_ms() - update['capture_ts'])
+        last = sequence
+        deadline = time.monotonic() + 2.0
+    reader.close()
+    results.put(latencies)
+
+def send_udp(updates, tracks, interval):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    send_times = []
+    for frame in range(updates):
+        tracking_data = make_tracks(tracks)
+        start = time.perf_counter_ns()
+        update = {'frame': frame, 'capture_ts': now_ms(), 'tracks': tracking_data}
+        sock.sendto(json.dumps(update).encode("utf-8"), UDP_ADDRESS)  # Network.send_tracking_data without the console print
+        send_times.append((time.perf_counter_ns() - start) / 1e6)
+        time.sleep(interval / 1000)
+    sock.close()
+    return send_times
+
+def send_shm(network, updates, tracks, interval):
+    send_times = []
+    for frame in range(updates):
+        tracking_data = make_tracks(tracks)
+        start = time.perf_counter_ns()
+        network.send_tracking_data(tracking_data, FrameTrace(frame, now_ms(), host_clock=False))
+        send_times.append((time.perf_counter_ns() - start) / 1e6)
+        time.sleep(interval / 1000)
+    return send_times
+
+def run(transport, updates, tracks, interval):
+    """Run one transport; returns (send times, receive latencies) in ms."""
+    ready = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    network = None
+    if transport == "udp":
+        receiver = multiprocessing.Process(target=udp_receiver, args=(updates, ready, results))
+    else:
+        path = os.path.join(tempfile.gettempdir(), "livingstream_bench.mmap")
+        network = SharedMemoryNetwork(path, max_tracks=max(tracks, 1))
+        receiver = multiprocessing.Process(target=shm_receiver, args=(path, updates, ready, results))
+    receiver.start()
+    ready.wait()
+    try:
+        if network is None:
+            send_times = send_udp(updates, tracks, interval)
+        else:
+            send_times = send_shm(network, updates, tracks, interval)
+        latencies = results.get()
+    finally:
+        receiver.join()
+        if network is not None:
+            network.close()
+            os.remove(network.path)
+    return send_times, latencies
+
+def describe(values):
+    if not values:
+        return f"{'-':>8}{'-':>8}{'-':>8}{'-':>8}"
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return f"{p50:>8.3f}{p95:>8.3f}{p99:>8.3f}{max(values):>8.3f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the UDP and shared-memory output channels.")
+    parser.add_argument("--updates", type=int, default=2000, help="updates sent per transport")
+    parser.add_argument("--tracks", type=int, default=3, help="tracked people per update")
+    parser.add_argument("--interval", type=float, default=5.0, help="ms between updates")
+    parser.add_argument("--transports", nargs="+", default=["udp", "shared_memory"], choices=["udp", "shared_memory"])
+    args = parser.parse_args()
+
+    header = f"{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"
+    print(f"{'':<25} | {'send cost (ms)':<32} | delivery latency (ms)")
+    print(f"{'transport':<15}{'received':>10} | {header} | {header}")
+    for transport in args.transports:
+        send_times, latencies = run(transport, args.updates, args.tracks, args.interval)
+        print(f"{transport:<15}{len(latencies):>10} | {describe(send_times)} | {describe(latencies)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Compare the single-threaded main loop with the threaded tracking loop and RefreshLimiter.
+
+No camera, model or window is needed: a simulated camera delivers frames at a fixed rate
+(like wait_for_frames, keeping only the newest frame when the reader falls behind),
+tracking costs a fixed amount of CPU per frame, and drawing a screen costs a fixed amount
+of CPU with some spread. Both designs run the same work:
+- "single": the loop before TrackingLoop. Every iteration tracks a frame (live mode), draws
+  the screen, sends the frame and calls waitKey(1); the home screen redraws every iteration.
+- "threaded": TrackingLoop tracks and sends on its own thread, the UI loop redraws through
+  RefreshLimiter and sleeps in waitKey until the next redraw is due.
+
+For each design it reports the process CPU usage on the home screen (idle) and in live
+mode, and in live mode the intervals between frames sent to Unity (their spread is the
+jitter Unity sees) plus the number of camera frames dropped.
+
+Usage (from the repository root):
+    python -m tools.bench_ui_loop --duration 10 --fps 30 --track-ms 12 --draw-ms 6
+"""
+import argparse
+import threading
+import time
+import numpy as np
+import psutil
+from lib.scheduler import TrackingLoop, RefreshLimiter
+
+WINDOW_SHAPE = (720, 1280, 3)
+
+def burn(ms, scratch):
+    """Keep the CPU busy for ms milliseconds with image-sized numpy work (releases the GIL like cv2 does)."""
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        np.add(scratch, 1, out=scratch)
+
+class SimulatedCamera:
+    """Stands in for Tracker: frames arrive every 1/fps s, tracking one costs track_ms of CPU."""
+    def __init__(self, fps, track_ms):
+        self.period = 1.0 / fps
+        self.track_ms = track_ms
+        self.start = time.perf_counter()
+        self.last_frame = -1
+        self.dropped = 0                        # Frames that arrived but were replaced by a newer one unread
+        self.trace = None
+        self._scratch = np.zeros(WINDOW_SHAPE, dtype=np.uint8)
+
+    def idle_delay(self):
+        return 0.0
+
+    def process_frame(self, with_images=False):
+        newest = int((time.perf_counter() - self.start) / self.period)
+        if newest <= self.last_frame:           # Wait for the next frame
+            newest = self.last_frame + 1
+            time.sleep(max(0.0, self.start + newest * self.period - time.perf_counter()))
+        self.dropped += newest - self.last_frame - 1
+        self.last_frame = newest
+        burn(self.track_ms, self._scratch)
+        return [], None, None, self.track_ms
+
+class SimulatedWindow:
+    """Stands in for imshow and waitKey: a redraw costs draw_ms (+- spread) of CPU, waitKey sleeps."""
+    def __init__(self, draw_ms, spread_ms, seed=0):
+        self.draw_ms = draw_ms
+        self.spread_ms = spread_ms
+        self.draws = 0
+        self._rng = np.random.default_rng(seed)
+        self._scratch = np.zeros(WINDOW_SHAPE, dtype=np.uint8)
+
+    def draw(self):
+        self.draws += 1
+        burn(max(0.0, self.draw_ms + self._rng.uniform(-self.spread_ms, self.spread_ms)), self._scratch)
+
+    def wait_key(self, delay_ms):
+        time.sleep(delay_ms / 1000)
+
+class SendLog:
+    """Records when frames are sent (Network.send_tracking_data)."""
+    def __init__(self):
+        self.times = []
+        self.lock = threading.Lock()
+
+    def __call__(self, tracking_data, trace):
+        with self.lock:
+            self.times.append(time.perf_counter())
+
+def run_single(mode, duration, camera, window, send):
+    """The main loop before TrackingLoop: track, draw, send and waitKey(1) in one thread."""
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        if mode == "live":
+            tracking_data, _, _, _ = camera.process_frame()
+            window.draw()
+            send(tracking_data, camera.trace)
+        else:
+            window.draw()
+        window.wait_key(max(1, round(1000 * camera.idle_delay())) if mode == "live" else 1)
+
+def run_threaded(mode, duration, camera, window, send, max_fps, idle_poll):
+    """TrackingLoop sends from its own thread, the UI redraws only changes through RefreshLimiter."""
+    tracking = TrackingLoop(camera, send)
+    refresh = RefreshLimiter(max_fps, idle_poll)
+    tracking.start()
+    tracking.set_active(mode == "live")
+    end = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < end:
+            if mode == "live":
+                sequence, output = tracking.latest
+                if output is not None and refresh.should_draw(("live", sequence)):
+                    window.draw()
+            elif refresh.should_draw(("home",)):
+                window.draw()
+            window.wait_key(refresh.delay(mode == "live"))
+    finally:
+        tracking.stop()
+
+def measure(design, mode, args):
+    """
+    Returns:
+    - cpu: float, process CPU usage over the run (% of one core)
+    - intervals: array of ms between sent frames (live mode)
+    - dropped: int, camera frames never tracked
+    - draws: int, screens drawn
+    """
+    camera = SimulatedCamera(args.fps, args.track_ms)
+    window = SimulatedWindow(args.draw_ms, args.draw_spread_ms)
+    send = SendLog()
+    process = psutil.Process()
+    process.cpu_percent(None)                   # Start the measurement interval
+    if design == "single":
+        run_single(mode, args.duration, camera, window, send)
+    else:
+        run_threaded(mode, args.duration, camera, window, send, args.max_fps, args.idle_poll)
+    cpu = process.cpu_percent(None)
+    intervals = np.diff(send.times)[1:] * 1000 if len(send.times) > 2 else np.empty(0)   # First one includes startup
+    return cpu, intervals, camera.dropped, window.draws
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare idle CPU and send jitter of the two main loop designs.")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per design and mode")
+    parser.add_argument("--fps", type=float, default=30, help="simulated camera rate")
+    parser.add_argument("--track-ms", type=float, default=12, help="CPU cost of tracking one frame")
+    parser.add_argument("--draw-ms", type=float, default=6, help="mean CPU cost of drawing a screen")
+    parser.add_argument("--draw-spread-ms", type=float, default=4, help="draw cost varies by up to this much")
+    parser.add_argument("--max-fps", type=float, default=30, help="RefreshLimiter cap (UI_MAX_FPS)")
+    parser.add_argument("--idle-poll", type=float, default=0.05, help="RefreshLimiter idle poll (UI_IDLE_POLL)")
+    args = parser.parse_args()
+
+    print(f"camera {args.fps:g} fps, tracking {args.track_ms:g} ms, drawing {args.draw_ms:g} +- {args.draw_spread_ms:g} ms")
+    print(f"{'design':<10}{'idle CPU':>9}{'live CPU':>9}{'draws/s':>9} | send interval (ms): "
+          f"{'mean':>6}{'std':>6}{'p1':>6}{'p99':>6}{'max':>6}{'dropped':>8}")
+    for design in ("single", "threaded"):
+        idle_cpu, _, _, idle_draws = measure(design, "home", args)
+        live_cpu, intervals, dropped, _ = measure(design, "live", args)
+        if intervals.size:
+            p1, p99 = np.percentile(intervals, [1, 99])
+            spread = f"{intervals.mean():>6.1f}{intervals.std():>6.2f}{p1:>6.1f}{p99:>6.1f}{intervals.max():>6.1f}"
+        else:
+            spread = f"{'-':>30}"
+        print(f"{design:<10}{idle_cpu:>8.1f}%{live_cpu:>8.1f}%{idle_draws / args.duration:>9.1f} | "
+              f"{'':<19}{spread}{dropped:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Summarize a latency log written by the tracker (LATENCY_LOG in lib/app_settings.py).
+
+Prints the capture-to-send latency distribution, the time spent in each pipeline stage
+and the camera frame numbers that never made it to the network (dropped frames).
+
+Usage (from the repository root):
+    python -m tools.latency_report latency_log.jsonl
+"""
+import argparse
+import json
+import numpy as np
+
+def load_records(filename):
+    """Read one trace record per line, skipping a partially written last line."""
+    records = []
+    with open(filename) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+def find_dropped_frames(frame_numbers):
+    """
+    Find gaps in the camera frame counter.
+
+    The counter restarts whenever the pipeline does (after calibration, a new run appending
+    to the same log, a replayed recording), so the numbers, in logged order, are split into
+    segments wherever the counter goes backwards and gaps are only counted within a segment.
+
+    Returns:
+    - gaps: list of (first missing, last missing) frame number ranges
+    - segments: int, number of pipeline runs found in the log
+    """
+    frames = np.asarray(frame_numbers, dtype=np.int64)
+    frames = frames[frames >= 0]                # -1: frameset without a color frame
+    if frames.size == 0:
+        return [], 0
+    steps = np.diff(frames)
+    restarts = np.flatnonzero(steps < 0)        # Counter went backwards: a new segment starts after these
+    gaps = np.flatnonzero(steps > 1)
+    return [(int(frames[i]) + 1, int(frames[i + 1]) - 1) for i in gaps], restarts.size + 1
+
+def describe(name, values):
+    """Format a distribution as one table row."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return f"{name:<20}{'no data':>10}"
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return f"{name:<20}{values.size:>8}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}{values.max():>9.1f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Report capture-to-send latency and dropped frames.")
+    parser.add_argument("log_file", help="JSON Lines latency log")
+    parser.add_argument("--max-gaps", type=int, default=20, help="dropped frame ranges to list")
+    args = parser.parse_args()
+
+    records = load_records(args.log_file)
+    if not records:
+        print("No records found.")
+        return
+
+    # End-to-end latency, only available for host-clock timestamps
+    capture_to_send = [r['capture_to_arrival'] + r['stages']['send'] for r in records
+                       if r['capture_to_arrival'] is not None and 'send' in r['stages']]
+
+    # Time between consecutive stages, in the order they were stamped
+    stage_durations = {}
+    for r in records:
+        previous = 0.0
+        for stage, elapsed in r['stages'].items():
+            stage_durations.setdefault(stage, []).append(elapsed - previous)
+            previous = elapsed
+
+    print(f"{'stage (ms)':<20}{'count':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    print(describe("capture->arrival", [r['capture_to_arrival'] for r in records
+                                        if r['capture_to_arrival'] is not None]))
+    for stage, durations in stage_durations.items():
+        print(describe(f"  ->{stage}", durations))
+    print(describe("capture->send", capture_to_send))
+
+    gaps, segments = find_dropped_frames([r['frame'] for r in records])
+    dropped = sum(last - first + 1 for first, last in gaps)
+    total = dropped + len(records)
+    print()
+    print(f"Dropped frames: {dropped} of {total} ({100 * dropped / total:.1f}%) in {len(gaps)} gaps"
+          f" over {segments} pipeline run{'s' if segments != 1 else ''}")
+    for first, last in gaps[:args.max_gaps]:
+        print(f"  {first}" if first == last else f"  {first}-{last}")
+    if len(gaps) > args.max_gaps:
+        print(f"  ... {len(gaps) - args.max_gaps} more")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Load test the streaming server with many simulated subscribers.
+
+The server runs in this process and is fed synthetic tracking data at camera rate from
+the main thread, the way the tracking loop feeds it. Subscribers run in a separate
+process: most read as fast as they can, some read slowly and some never read at all.
+Reports how long each publish call took on the "tracking loop" and how many updates the
+fast and slow subscribers received.
+
+Usage (from the repository root):
+    python -m tools.load_test_stream --clients 300 --slow 0.2 --stalled 0.05 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+import numpy as np
+from lib.stream_server import StreamServer
+
+FIELD_SELECTIONS = [None, ["id", "position"], ["id", "bbox"]]   # Subscribers cycle through these
+
+def make_tracks(count):
+    return [{'id': i + 1, 'position': [0.5 * i, 0.0, 2.0], 'bbox': [100, 100, 200, 400],
+             'keypoints': [[320.0, 240.0, 0.9]] * 17} for i in range(count)]
+
+async def subscriber(port, fields, delay, stop_at):
+    """Receive until stop_at; delay None never reads. Returns (updates received, largest sequence gap)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((json.dumps({"fields": fields}) + "\n").encode("utf-8"))
+    await writer.drain()
+    received = largest_gap = last = 0
+    try:
+        if delay is None:
+            await asyncio.sleep(stop_at - time.monotonic())
+            return 0, 0
+        await reader.readline()                         # Subscription confirmation
+        while time.monotonic() < stop_at:
+            line = await asyncio.wait_for(reader.readline(), stop_at - time.monotonic())
+            sequence = json.loads(line)["sequence"]
+            received += 1
+            largest_gap = max(largest_gap, sequence - last)
+            last = sequence
+            if delay:
+                await asyncio.sleep(delay)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        writer.close()
+    return received, largest_gap
+
+def run_subscribers(port, kinds, slow_delay, stop_at, results):
+    async def main():
+        tasks = [subscriber(port, FIELD_SELECTIONS[i % len(FIELD_SELECTIONS)],
+                            {"fast": 0.0, "slow": slow_delay, "stalled": None}[kind], stop_at)
+                 for i, kind in enumerate(kinds)]
+        return await asyncio.gather(*tasks)
+    results.put(asyncio.run(main()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the tracking stream server.")
+    parser.add_argument("--clients", type=int, default=300, help="simulated subscribers")
+    parser.add_argument("--slow", type=float, default=0.2, help="fraction of subscribers that read slowly")
+    parser.add_argument("--stalled", type=float, default=0.05, help="fraction of subscribers that never read")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="seconds a slow subscriber waits between reads")
+    parser.add_argument("--fps", type=float, default=60, help="publish rate of the simulated tracking loop")
+    parser.add_argument("--tracks", type=int, default=3, help="tracked people per update")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to publish for")
+    parser.add_argument("--port", type=int, default=5907)
+    args = parser.parse_args()
+
+    stalled = int(args.clients * args.stalled)
+    slow = int(args.clients * args.slow)
+    kinds = ["stalled"] * stalled + ["slow"] * slow + ["fast"] * (args.clients - stalled - slow)
+
+    server = StreamServer(port=args.port)
+    server.start()
+    stop_at = time.monotonic() + args.duration + 2.0     # Subscribers connect during the first 2s
+    results = multiprocessing.Queue()
+    clients = multiprocessing.Process(target=run_subscribers,
+                                      args=(args.port, kinds, args.slow_delay, stop_at, results))
+    clients.start()
+    while len(server.subscribers) < args.clients - stalled and time.monotonic() < stop_at - args.duration:
+        time.sleep(0.05)
+    print(f"{len(server.subscribers)} subscribers connected ({slow} slow, {stalled} stalled)")
+
+    publish_times = []
+    late = 0
+    period = 1.0 / args.fps
+    next_frame = time.perf_counter()
+    frame = 0
+    while time.monotonic() < stop_at - 0.5:
+        tracking_data = make_tracks(args.tracks)
+        start = time.perf_counter_ns()
+        server.send_tracking_data(tracking_data)
+        publish_times.append((time.perf_counter_ns() - start) / 1e6)
+        frame += 1
+        next_frame += period
+        wait = next_frame - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        else:
+            late += 1
+    stats = results.get()
+    clients.join()
+    server.close()
+
+    p50, p99, p999 = np.percentile(publish_times, [50, 99, 99.9])
+    print(f"published {frame} updates, {late} frames late")
+    print(f"publish call (ms): p50 {p50:.4f}  p99 {p99:.4f}  p99.9 {p999:.4f}  max {max(publish_times):.4f}")
+    print(f"{'subscribers':<12}{'count':>7}{'updates p50':>13}{'updates min':>13}{'max gap':>9}")
+    for kind in ("fast", "slow", "stalled"):
+        rows = [stat for stat, k in zip(stats, kinds) if k == kind]
+        if rows:
+            received = [r for r, _ in rows]
+            print(f"{kind:<12}{len(rows):>7}{int(np.median(received)):>13}{min(received):>13}{max(g for _, g in rows):>9}")
+
+if __name__ == "__main__":
+    main()